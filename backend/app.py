@@ -27,10 +27,12 @@ from routes.stripe_webhooks import stripe_bp
 from routes.sms import sms_bp
 from routes.stripe_routes import stripe_routes_bp
 from routes.admin import admin_bp
+from utils.json_provider import OrJSONProvider
 
 # ✅ Create Flask app
 app = Flask(__name__)
 app.url_map.strict_slashes = False  # Accept /api/entry and /api/entry/
+app.json = OrJSONProvider(app)  # Faster jsonify for large entry lists
 
 # ✅ CORS Configuration (production + local dev)
 CORS(app,
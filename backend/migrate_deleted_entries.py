@@ -0,0 +1,76 @@
+"""
+One-off migration: move entries soft-deleted with deleted_flag=True into the
+entries_deleted collection, where delete_entry now puts them.
+
+Entry, export and admin readers no longer filter on deleted_flag, so flagged
+entries reappear until they are moved. Run it right after deploying that
+change: until then the old code keeps soft-deleting with deleted_flag=True,
+so a run before the deploy would miss entries deleted in between. It can
+also be run before the deploy to shrink the window, as long as it is run
+again right after:
+
+    cd backend && python migrate_deleted_entries.py --dry-run
+    cd backend && python migrate_deleted_entries.py
+
+Safe to re-run; migrated entries no longer match the query.
+"""
+import argparse
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from utils import firebase  # noqa: F401 (initializes the Firebase app)
+from utils.db import get_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Each entry is one set and one delete; Firestore allows 500 writes per batch
+ENTRIES_PER_BATCH = 250
+
+def migrate_deleted_entries(dry_run=False):
+    """
+    Move every deleted_flag=True entry into entries_deleted.
+
+    The archived copy drops deleted_flag and records deleted_at as the
+    entry's last update time, which is when the flag was set.
+
+    Returns:
+        Number of entries moved (or that would be moved, for a dry run)
+    """
+    db = get_db()
+    flagged = db.collection("entries").where("deleted_flag", "==", True)
+
+    if dry_run:
+        count = sum(1 for _ in flagged.stream())
+        logger.info(f"🔎 {count} soft-deleted entries would be moved")
+        return count
+
+    moved = 0
+    while True:
+        # Moved entries drop out of the query, so each pass takes the next page
+        docs = list(flagged.limit(ENTRIES_PER_BATCH).stream())
+        if not docs:
+            break
+
+        batch = db.batch()
+        for doc in docs:
+            deleted_entry = doc.to_dict()
+            deleted_entry.pop("deleted_flag", None)
+            deleted_entry["deleted_at"] = doc.update_time
+            batch.set(db.collection("entries_deleted").document(doc.id), deleted_entry)
+            batch.delete(doc.reference)
+        batch.commit()
+
+        moved += len(docs)
+        logger.info(f"✅ Moved {moved} soft-deleted entries so far")
+
+    logger.info(f"✅ Migration finished: {moved} entries moved to entries_deleted")
+    return moved
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="only count the entries to move")
+    args = parser.parse_args()
+    migrate_deleted_entries(dry_run=args.dry_run)
@@ -2,15 +2,13 @@ from flask import Blueprint, request, jsonify
 import logging
 import traceback
 from firebase_admin import firestore
+from utils.db import get_db
 from datetime import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Firestore
-db = firestore.client()
-
 # Create blueprint
 admin_bp = Blueprint("admin", __name__)
 
@@ -37,7 +35,7 @@ def get_users():
         offset = int(request.args.get("offset", 0))
         
         # Start with base query
-        query = db.collection("users")
+        query = get_db().collection("users")
         
         # Apply filters if provided
         if status:
@@ -116,7 +114,7 @@ def get_subscriptions():
         offset = int(request.args.get("offset", 0))
         
         # Start with base query - get users with subscriptions
-        query = db.collection("users").where("subscription_active", "==", True)
+        query = get_db().collection("users").where("subscription_active", "==", True)
         
         # Apply filters if provided
         if status:
@@ -201,7 +199,7 @@ def search():
         
         # Search users
         if not result_type or result_type == "users":
-            users_query = db.collection("users").limit(100).stream()
+            users_query = get_db().collection("users").limit(100).stream()
             for doc in users_query:
                 user = doc.to_dict()
                 user_id = doc.id
@@ -226,7 +224,7 @@ def search():
         
         # Search subscriptions
         if not result_type or result_type == "subscriptions":
-            subs_query = db.collection("users").where("subscription_active", "==", True).limit(100).stream()
+            subs_query = get_db().collection("users").where("subscription_active", "==", True).limit(100).stream()
             for doc in subs_query:
                 user = doc.to_dict()
                 user_id = doc.id
@@ -251,7 +249,7 @@ def search():
         
         # Search entries
         if not result_type or result_type == "entries":
-            entries_query = db.collection("entries").where("deleted_flag", "==", False).limit(100).stream()
+            entries_query = get_db().collection("entries").limit(100).stream()
             for doc in entries_query:
                 entry = doc.to_dict()
                 entry_id = doc.id
@@ -294,25 +292,25 @@ def get_stats():
         now = datetime.now()
         
         # Get total users count
-        users_count = len(list(db.collection("users").stream()))
+        users_count = len(list(get_db().collection("users").stream()))
         
         # Get active subscriptions count
-        active_subs_count = len(list(db.collection("users").where("subscription_active", "==", True).stream()))
+        active_subs_count = len(list(get_db().collection("users").where("subscription_active", "==", True).stream()))
         
         # Get total entries count
-        entries_count = len(list(db.collection("entries").where("deleted_flag", "==", False).stream()))
+        entries_count = len(list(get_db().collection("entries").stream()))
         
         # Calculate MRR (Monthly Recurring Revenue)
-        monthly_subs = len(list(db.collection("users").where("subscription_active", "==", True).where("subscription_plan", "==", "monthly").stream()))
-        annual_subs = len(list(db.collection("users").where("subscription_active", "==", True).where("subscription_plan", "==", "annual").stream()))
+        monthly_subs = len(list(get_db().collection("users").where("subscription_active", "==", True).where("subscription_plan", "==", "monthly").stream()))
+        annual_subs = len(list(get_db().collection("users").where("subscription_active", "==", True).where("subscription_plan", "==", "annual").stream()))
         
         mrr = (monthly_subs * 9.99) + (annual_subs * 99.99 / 12)
         
         # Get trial users count
-        trial_users_count = len(list(db.collection("users").where("subscription_status", "==", "trialing").stream()))
+        trial_users_count = len(list(get_db().collection("users").where("subscription_status", "==", "trialing").stream()))
         
         # Calculate trial conversion rate (simplified)
-        converted_trials = len(list(db.collection("users").where("subscription_active", "==", True).where("subscription_status", "==", "active").stream()))
+        converted_trials = len(list(get_db().collection("users").where("subscription_active", "==", True).where("subscription_status", "==", "active").stream()))
         trial_conversion_rate = (converted_trials / (converted_trials + trial_users_count)) * 100 if (converted_trials + trial_users_count) > 0 else 0
         
         # Get entries created in last 30 days
@@ -360,7 +358,7 @@ def get_user(user_id):
         logger.info(f"👤 Admin user detail endpoint hit for user {user_id}")
         
         # Get user document
-        user_ref = db.collection("users").document(user_id)
+        user_ref = get_db().collection("users").document(user_id)
         user_doc = user_ref.get()
         
         if not user_doc.exists:
@@ -370,7 +368,7 @@ def get_user(user_id):
         user = user_doc.to_dict()
         
         # Get user's entries
-        entries_query = db.collection("entries").where("author_id", "==", user_id).where("deleted_flag", "==", False).stream()
+        entries_query = get_db().collection("entries").where("author_id", "==", user_id).stream()
         entries = []
         for doc in entries_query:
             entry = doc.to_dict()
@@ -438,7 +436,7 @@ def update_user(user_id):
             return jsonify({"error": "No data provided"}), 400
             
         # Get user document
-        user_ref = db.collection("users").document(user_id)
+        user_ref = get_db().collection("users").document(user_id)
         user_doc = user_ref.get()
         
         if not user_doc.exists:
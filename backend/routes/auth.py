@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from twilio.rest import Client
+from utils.sms import get_twilio_client
 import os
 import random
 
@@ -24,7 +24,7 @@ def send_invite():
     invite_url = f"https://myhatchling.ai/login?token={invite_token}&journal={journal_id}&role={role}"
     message = f"You've been invited to Hatchling! Tap to join: {invite_url}"
 
-    client = Client(os.getenv("TWILIO_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
+    client = get_twilio_client()
     client.messages.create(
         body=message,
         from_=os.getenv("TWILIO_PHONE_NUMBER"),
@@ -42,7 +42,7 @@ def request_login():
     token = str(random.randint(100000, 999999))
     login_tokens[phone] = token
 
-    client = Client(os.getenv("TWILIO_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
+    client = get_twilio_client()
     client.messages.create(
         body=f"Your Hatchling login code: {token}",
         from_=os.getenv("TWILIO_PHONE_NUMBER"),
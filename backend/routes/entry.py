@@ -1,22 +1,128 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from firebase_admin import firestore
+from utils.db import get_db
 from utils.media import upload_media_to_firebase
-from utils.openai_client import transcribe_audio, get_ai_tags
+from utils.tag_cache import get_or_compute_tags
+from utils.openai_client import should_ai_tag, generate_fallback_tags
+from utils.tasks import enqueue_media_processing, fail_stale_pending_entries
+from utils.multipart import stream_multipart_form
+from utils.firestore_writes import queue_update
+from utils.helpers import parse_memory_date
+import asyncio
+import base64
+import binascii
 import logging
+import os
+import time
 import traceback
-from datetime import datetime
-from google.cloud.firestore_v1.base_query import FieldFilter
+from datetime import date
+from functools import lru_cache
+from google.api_core.exceptions import FailedPrecondition, NotFound
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 entry_bp = Blueprint("entry", __name__)
-db = firestore.client()
+
+VALID_PRIVACY = frozenset(("private", "shared", "public"))
+
+# Fields get_entries can project with ?fields=
+SELECTABLE_FIELDS = frozenset((
+    "content", "author_id", "date_of_memory", "privacy", "tags", "media_url", "media_urls",
+    "transcription", "source_type", "timestamp_created", "processing_status", "sms_metadata"
+))
+
+# get_entries page size
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+@lru_cache(maxsize=1)
+def _today_for_minute(minute):
+    return date.today().timetuple()[:3]
+
+def _today_tuple():
+    """Today's (year, month, day), refreshed at most once a minute."""
+    return _today_for_minute(int(time.time()) // 60)
+
+def _uniq(xs):
+    """Order-preserving dedupe that drops empty values."""
+    if len(xs) > 16:
+        return [x for x in dict.fromkeys(xs) if x]
+    seen = []
+    for x in xs:
+        if x and x not in seen:
+            seen.append(x)
+    return seen
+
+def _encode_cursor(date_of_memory, doc_id):
+    """Opaque page cursor for the last entry of a page."""
+    return base64.urlsafe_b64encode(f"{date_of_memory}|{doc_id}".encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor):
+    """
+    Decode a page cursor.
+    
+    Returns:
+        Tuple of (date_of_memory, doc_id)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    date_of_memory, sep, doc_id = decoded.partition("|")
+    if not sep or not doc_id:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return date_of_memory, doc_id
+
+def _check_memory_date(date_of_memory):
+    """
+    Validate a YYYY-MM-DD memory date.
+    
+    Returns:
+        Tuple of (zero-padded ISO date to store, None), or (None, error message)
+    """
+    parsed = parse_memory_date(date_of_memory)
+    if parsed is None:
+        logger.warning(f"Invalid date format: {date_of_memory}")
+        return None, "Invalid date format. Use YYYY-MM-DD."
+    if (parsed.year, parsed.month, parsed.day) > _today_tuple():
+        logger.warning(f"Future date provided: {date_of_memory}")
+        return None, "The memory date cannot be in the future."
+    return parsed.isoformat(), None
+
+ENTRY_FORM_FIELDS = ("content", "author_id", "date_of_memory", "privacy", "tags", "source_type", "journal_id")
+
+@entry_bp.before_request
+def stream_entry_form():
+    """
+    Parse multipart bodies for create/update with streaming-form-data so the
+    media part is written straight to a temporary file as it arrives.
+    """
+    if request.endpoint not in ("entry.create_entry", "entry.update_entry"):
+        return
+    if request.mimetype == "multipart/form-data":
+        try:
+            g.entry_form, g.entry_media = stream_multipart_form(ENTRY_FORM_FIELDS, "media")
+        except ValueError as e:
+            logger.warning(f"Malformed multipart body: {str(e)}")
+            return jsonify({"error": "Malformed multipart form data"}), 400
+    else:
+        g.entry_form, g.entry_media = request.form, None
+
+@entry_bp.teardown_request
+def discard_unclaimed_media(exc):
+    """Remove a streamed upload that was not handed to a background job."""
+    media = g.pop("entry_media", None)
+    if media and os.path.exists(media["path"]):
+        os.remove(media["path"])
 
 @entry_bp.route("", methods=["POST"])
 @entry_bp.route("/", methods=["POST"])
-def create_entry():
+async def create_entry():
     """
     Create a new memory entry with text, media, tags, and metadata.
     
@@ -30,15 +136,20 @@ def create_entry():
     - tags: List of manual tags
     - media: File upload (photo, video, audio)
     - source_type: 'app', 'sms', or 'voice' (default: 'app')
+    
+    Media upload, transcription and AI tagging run in the background; when
+    any of them is queued the response is 202 and the stored entry has
+    processing_status 'pending' until they finish.
     """
     try:
         logger.info("📥 POST /api/entry hit!")
-        content = request.form.get("content", "")
-        author_id = request.form.get("author_id")
-        date_of_memory = request.form.get("date_of_memory")
-        privacy = request.form.get("privacy", "private")
-        manual_tags = request.form.getlist("tags")
-        source_type = request.form.get("source_type", "app")
+        form = g.entry_form
+        content = form.get("content", "")
+        author_id = form.get("author_id")
+        date_of_memory = form.get("date_of_memory")
+        privacy = form.get("privacy", "private")
+        manual_tags = form.getlist("tags")
+        source_type = form.get("source_type", "app")
 
         # Validate required fields
         if not author_id or not date_of_memory:
@@ -46,56 +157,27 @@ def create_entry():
             return jsonify({"error": "Missing required fields: author_id or date_of_memory"}), 400
 
         # Validate privacy setting
-        valid_privacy_options = ["private", "shared", "public"]
-        if privacy not in valid_privacy_options:
+        if privacy not in VALID_PRIVACY:
             logger.warning(f"Invalid privacy option: {privacy}")
             privacy = "private"  # Default to private if invalid
 
-        # Validate date is not in the future
-        try:
-            memory_date = datetime.strptime(date_of_memory, "%Y-%m-%d")
-            today = datetime.now()
-            if memory_date > today:
-                logger.warning(f"Future date provided: {date_of_memory}")
-                return jsonify({"error": "The memory date cannot be in the future."}), 400
-        except ValueError:
-            logger.warning(f"Invalid date format: {date_of_memory}")
-            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+        # Validate date format and that it is not in the future
+        date_of_memory, date_error = _check_memory_date(date_of_memory)
+        if date_error:
+            return jsonify({"error": date_error}), 400
 
-        # Handle tags
-        tag_list = [tag.strip() for tag in manual_tags if tag.strip()]
-        ai_tags = []
-        if content and not tag_list:  # Only generate AI tags if no manual tags provided
-            try:
-                ai_tags = get_ai_tags(content)
-                logger.info(f"🧠 AI tags generated: {ai_tags}")
-            except Exception as e:
-                logger.error(f"❌ AI tag generation failed: {str(e)}")
-                # Continue without AI tags rather than failing the request
-        combined_tags = list(set(tag_list + ai_tags))
-
-        # Handle media
-        file = request.files.get("media")
-        media_url = None
-        transcription = None
-        if file:
-            try:
-                logger.info(f"📂 Media file received: {file.filename}")
-                file.stream.seek(0)
-                
-                # Create folder structure by user_id
-                folder_path = f"users/{author_id}/entries"
-                media_url = upload_media_to_firebase(file.stream, file.filename, file.content_type, folder_path)
-                logger.info(f"✅ Media uploaded to: {media_url}")
-
-                # Transcribe audio files
-                file.stream.seek(0)
-                if file.filename.lower().endswith((".m4a", ".mp3", ".ogg", ".wav")):
-                    transcription = transcribe_audio(file.stream)
-                    logger.info(f"📝 Transcription: {transcription}")
-            except Exception as e:
-                logger.error(f"❌ Media upload or transcription failed: {str(e)}")
-                # Continue without media rather than failing the request
+        # Handle tags; AI tags are only generated if no manual tags provided
+        tag_list = _uniq([tag.strip() for tag in manual_tags])
+        if content and not tag_list and not should_ai_tag(content):
+            # Too short for OpenAI; keyword tags are cheap enough to do inline
+            tag_list = generate_fallback_tags(content)
+        generate_tags = bool(content) and not tag_list
+
+        # Media was streamed to disk; upload and transcription run after the response
+        media = g.entry_media
+        if media:
+            logger.info(f"📂 Media file received: {media['filename']}")
+        pending = bool(media) or generate_tags
 
         # Compose and save entry
         entry = {
@@ -103,28 +185,46 @@ def create_entry():
             "author_id": author_id,
             "date_of_memory": date_of_memory,
             "privacy": privacy,
-            "tags": combined_tags,
-            "media_url": media_url,
-            "transcription": transcription,
+            "tags": tag_list,
+            "media_url": None,
+            "transcription": None,
             "source_type": source_type,
             "timestamp_created": firestore.SERVER_TIMESTAMP,
-            "deleted_flag": False
+            "updated_at": firestore.SERVER_TIMESTAMP,
+            "processing_status": "pending" if pending else "done"
         }
 
         # Add journal_id for future multi-child support
-        journal_id = request.form.get("journal_id")
+        journal_id = form.get("journal_id")
         if journal_id:
             entry["journal_id"] = journal_id
 
-        doc_ref = db.collection("entries").add(entry)
-        entry_id = doc_ref[1].id
+        doc_ref = get_db().collection("entries").document()
+        await asyncio.to_thread(doc_ref.create, entry)
+        entry_id = doc_ref.id
         logger.info(f"✅ Entry created: {entry_id} by {author_id}")
+
+        # Kept on the user for the inactivity nudge run, so it need not query entries
+        queue_update(get_db().collection("users").document(author_id), {"last_entry_ts": firestore.SERVER_TIMESTAMP})
+
+        if pending:
+            # The background job now owns the streamed file
+            media = g.pop("entry_media", None) or {}
+            enqueue_media_processing(
+                entry_id, media.get("path"), media.get("filename"), media.get("content_type"),
+                author_id, content, generate_tags
+            )
+            return jsonify({
+                "entry_id": entry_id,
+                "status": "accepted",
+                "tags": tag_list
+            }), 202
         
         return jsonify({
             "entry_id": entry_id, 
             "status": "created",
-            "tags": combined_tags,
-            "media_url": media_url
+            "tags": tag_list,
+            "media_url": None
         }), 200
 
     except Exception as e:
@@ -134,15 +234,22 @@ def create_entry():
 
 @entry_bp.route("", methods=["GET"])
 @entry_bp.route("/", methods=["GET"])
-def get_entries():
+async def get_entries():
     """
-    Fetch all entries for a journal with optional filters.
+    Fetch a page of entries for a journal with optional filters.
     
     Query parameters:
     - author_id: Filter by author
     - tag: Filter by tag
     - privacy: Filter by privacy level
     - sort_order: 'asc' or 'desc' (default: 'desc')
+    - limit: Page size (default: 50, max: 200)
+    - cursor: next_cursor value from the previous page
+    - fields: Comma-separated fields to return (default: all). List views can
+      pass 'date_of_memory,tags,media_url,privacy' to skip content and
+      transcription; entry_id is always included.
+    
+    The response includes next_cursor, which is null on the last page.
     """
     try:
         logger.info("📥 GET /api/entry hit!")
@@ -152,16 +259,43 @@ def get_entries():
         tag_filter = request.args.get("tag")
         privacy_filter = request.args.get("privacy")
         sort_order = request.args.get("sort_order", "desc").lower()
+        cursor = request.args.get("cursor")
         
         # Validate sort order
         if sort_order not in ["asc", "desc"]:
             sort_order = "desc"
             
+        # Validate page size
+        try:
+            limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+            
+        # Decode page cursor
+        start_after = None
+        if cursor:
+            try:
+                cursor_date, cursor_id = _decode_cursor(cursor)
+            except ValueError:
+                logger.warning(f"Invalid cursor: {cursor}")
+                return jsonify({"error": "Invalid cursor"}), 400
+            start_after = {"date_of_memory": cursor_date, "__name__": cursor_id}
+            
+        # Validate field projection; date_of_memory is needed for the cursor
+        fields = _uniq([f.strip() for f in request.args.get("fields", "").split(",")])
+        fields = [f for f in fields if f != "entry_id"]
+        unknown_fields = [f for f in fields if f not in SELECTABLE_FIELDS]
+        if unknown_fields:
+            logger.warning(f"Unknown fields requested: {unknown_fields}")
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown_fields)}"}), 400
+        if fields and "date_of_memory" not in fields:
+            fields.append("date_of_memory")
+            
         # Convert to Firestore direction
         direction = firestore.Query.DESCENDING if sort_order == "desc" else firestore.Query.ASCENDING
         
-        # Start with base query
-        query = db.collection("entries").where("deleted_flag", "==", False)
+        # Start with base query (deleted entries live in entries_deleted)
+        query = get_db().collection("entries")
         
         # Apply filters if provided
         if author_id:
@@ -170,27 +304,35 @@ def get_entries():
         if privacy_filter:
             query = query.where("privacy", "==", privacy_filter)
             
+        if tag_filter:
+            query = query.where("tags", "array_contains", tag_filter)
+            
         # Apply sorting
         try:
-            query = query.order_by("date_of_memory", direction=direction)
+            query = query.order_by("date_of_memory", direction=direction).order_by("__name__", direction=direction)
+            if start_after:
+                query = query.start_after(start_after)
+            query = query.limit(limit)
+            if fields:
+                query = query.select(fields)
             
-            # Execute query
-            docs = query.stream()
+            # Execute query off the event loop
+            docs = await asyncio.to_thread(list, query.stream())
             
             # Process results
             entries = []
             for doc in docs:
                 entry = doc.to_dict()
                 entry["entry_id"] = doc.id
-                
-                # Apply tag filter after fetching (Firestore doesn't support array contains in compound queries)
-                if tag_filter and tag_filter not in entry.get("tags", []):
-                    continue
-                    
                 entries.append(entry)
 
+            next_cursor = None
+            if len(docs) == limit:
+                last = entries[-1]
+                next_cursor = _encode_cursor(last.get("date_of_memory", ""), last["entry_id"])
+
             logger.info(f"📦 Returning {len(entries)} entries")
-            return jsonify({"entries": entries}), 200
+            return jsonify({"entries": entries, "next_cursor": next_cursor}), 200
             
         except Exception as query_error:
             # Check if this is an index error
@@ -221,7 +363,7 @@ def get_entries():
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 @entry_bp.route("/<entry_id>", methods=["PATCH"])
-def update_entry(entry_id):
+async def update_entry(entry_id):
     """
     Update an existing entry.
     
@@ -229,29 +371,22 @@ def update_entry(entry_id):
     - entry_id: ID of the entry to update
     
     Form data:
-    - Same fields as create_entry
+    - Same fields as create_entry; author_id and date_of_memory are required,
+      other fields are only changed when sent
     """
     try:
         logger.info(f"🛠 PATCH /api/entry/{entry_id} hit")
         
-        # Check if entry exists
-        entry_ref = db.collection("entries").document(entry_id)
-        entry_doc = entry_ref.get()
+        entry_ref = get_db().collection("entries").document(entry_id)
         
-        if not entry_doc.exists:
-            logger.warning(f"Entry not found: {entry_id}")
-            return jsonify({"error": "Entry not found"}), 404
-            
-        # Get existing entry data
-        existing_entry = entry_doc.to_dict()
-        
-        # Get form data
-        data = request.form
-        content = data.get("content", existing_entry.get("content", ""))
-        author_id = data.get("author_id", existing_entry.get("author_id"))
-        date_of_memory = data.get("date_of_memory", existing_entry.get("date_of_memory"))
-        privacy = data.get("privacy", existing_entry.get("privacy", "private"))
-        manual_tags = request.form.getlist("tags")
+        # Get form data (editable fields must be sent explicitly; no read-back
+        # of the stored entry is done to fill in defaults)
+        data = g.entry_form
+        content = data.get("content")
+        author_id = data.get("author_id")
+        date_of_memory = data.get("date_of_memory")
+        privacy = data.get("privacy")
+        manual_tags = data.getlist("tags")
         
         # Validate required fields
         if not author_id or not date_of_memory:
@@ -259,72 +394,75 @@ def update_entry(entry_id):
             return jsonify({"error": "Missing required fields: author_id or date_of_memory"}), 400
             
         # Validate privacy setting
-        valid_privacy_options = ["private", "shared", "public"]
-        if privacy not in valid_privacy_options:
+        if privacy is not None and privacy not in VALID_PRIVACY:
             logger.warning(f"Invalid privacy option: {privacy}")
-            privacy = existing_entry.get("privacy", "private")
+            privacy = None  # Leave the stored privacy untouched
             
-        # Validate date is not in the future
-        try:
-            memory_date = datetime.strptime(date_of_memory, "%Y-%m-%d")
-            today = datetime.now()
-            if memory_date > today:
-                logger.warning(f"Future date provided: {date_of_memory}")
-                return jsonify({"error": "The memory date cannot be in the future."}), 400
-        except ValueError:
-            logger.warning(f"Invalid date format: {date_of_memory}")
-            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
-
-        # Handle tags
-        tag_list = [tag.strip() for tag in manual_tags if tag.strip()]
-        ai_tags = []
-        if not tag_list and content:
-            try:
-                ai_tags = get_ai_tags(content)
-                logger.info(f"🧠 AI tags (update): {ai_tags}")
-            except Exception as e:
-                logger.error(f"❌ AI tag generation failed in PATCH: {str(e)}")
-                # Continue without AI tags rather than failing the request
+        # Validate date format and that it is not in the future
+        date_of_memory, date_error = _check_memory_date(date_of_memory)
+        if date_error:
+            return jsonify({"error": date_error}), 400
 
-        combined_tags = list(set(tag_list + ai_tags))
+        # Handle tags; AI tags are only generated if no manual tags provided
+        tag_list = _uniq([tag.strip() for tag in manual_tags])
+        if content and not tag_list and not should_ai_tag(content):
+            # Too short for OpenAI; keyword tags are cheap enough to do inline
+            tag_list = generate_fallback_tags(content)
+        generate_tags = bool(content) and not tag_list
 
-        # Prepare update data
+        # Prepare update data; omitted fields keep their stored values
         update_data = {
-            "content": content,
             "author_id": author_id,
-            "date_of_memory": date_of_memory,
-            "privacy": privacy,
-            "tags": combined_tags if combined_tags else existing_entry.get("tags", [])
+            "date_of_memory": date_of_memory
         }
+        if content is not None:
+            update_data["content"] = content
+        if privacy is not None:
+            update_data["privacy"] = privacy
+        if tag_list:
+            update_data["tags"] = tag_list
 
-        # Handle media
-        file = request.files.get("media")
-        if file:
-            try:
-                logger.info(f"📂 Updating with media file: {file.filename}")
-                file.stream.seek(0)
-                
-                # Create folder structure by user_id
-                folder_path = f"users/{author_id}/entries"
-                update_data["media_url"] = upload_media_to_firebase(file.stream, file.filename, file.content_type, folder_path)
-
-                # Transcribe audio files
-                file.stream.seek(0)
-                if file.filename.lower().endswith((".m4a", ".mp3", ".ogg", ".wav")):
-                    update_data["transcription"] = transcribe_audio(file.stream)
-            except Exception as e:
-                logger.error(f"❌ Media upload or transcription failed in PATCH: {str(e)}")
-                # Continue without media rather than failing the request
-
-        # Update the entry
-        entry_ref.update(update_data)
+        # Media was streamed to disk; upload and transcription run after the response
+        media = g.entry_media
+        if media:
+            logger.info(f"📂 Updating with media file: {media['filename']}")
+        pending = bool(media) or generate_tags
+        if pending:
+            update_data["processing_status"] = "pending"
+
+        # Update the entry; update() carries an implicit exists precondition,
+        # so a missing document surfaces as NotFound without a separate read
+        try:
+            await asyncio.to_thread(
+                entry_ref.update, {**update_data, "updated_at": firestore.SERVER_TIMESTAMP}
+            )
+        except NotFound:
+            logger.warning(f"Entry not found: {entry_id}")
+            return jsonify({"error": "Entry not found"}), 404
         logger.info(f"✅ Entry {entry_id} updated successfully")
+
+        # Echo the written fields so clients don't need to re-read the entry
+        updated_fields = {**update_data, "entry_id": entry_id}
+
+        if pending:
+            # The background job now owns the streamed file
+            media = g.pop("entry_media", None) or {}
+            enqueue_media_processing(
+                entry_id, media.get("path"), media.get("filename"), media.get("content_type"),
+                author_id, content, generate_tags
+            )
+            return jsonify({
+                "status": "accepted",
+                "entry_id": entry_id,
+                "tags": tag_list,
+                "entry": updated_fields
+            }), 202
         
         return jsonify({
             "status": "updated",
             "entry_id": entry_id,
-            "tags": update_data.get("tags", []),
-            "media_url": update_data.get("media_url")
+            "tags": tag_list,
+            "entry": updated_fields
         }), 200
 
     except Exception as e:
@@ -333,9 +471,9 @@ def update_entry(entry_id):
         return jsonify({"error": "Update failed", "details": str(e)}), 500
 
 @entry_bp.route("/<entry_id>", methods=["DELETE"])
-def delete_entry(entry_id):
+async def delete_entry(entry_id):
     """
-    Soft delete an entry (sets deleted_flag to true).
+    Soft delete an entry (moves it to the entries_deleted collection).
     
     Path parameter:
     - entry_id: ID of the entry to delete
@@ -344,15 +482,26 @@ def delete_entry(entry_id):
         logger.info(f"🗑️ DELETE /api/entry/{entry_id} hit")
         
         # Check if entry exists
-        entry_ref = db.collection("entries").document(entry_id)
-        entry_doc = entry_ref.get()
+        entry_ref = get_db().collection("entries").document(entry_id)
+        entry_doc = await asyncio.to_thread(entry_ref.get)
         
         if not entry_doc.exists:
             logger.warning(f"Entry not found for deletion: {entry_id}")
             return jsonify({"error": "Entry not found"}), 404
             
-        # Soft delete by setting deleted_flag to true
-        entry_ref.update({"deleted_flag": True})
+        # Soft delete by moving the entry into entries_deleted atomically; the
+        # delete is conditioned on the snapshot we copied, so a concurrent edit
+        # fails the batch instead of archiving a stale copy
+        deleted_entry = entry_doc.to_dict()
+        deleted_entry["deleted_at"] = firestore.SERVER_TIMESTAMP
+        batch = get_db().batch()
+        batch.set(get_db().collection("entries_deleted").document(entry_id), deleted_entry)
+        batch.delete(entry_ref, option=get_db().write_option(last_update_time=entry_doc.update_time))
+        try:
+            await asyncio.to_thread(batch.commit)
+        except FailedPrecondition:
+            logger.warning(f"Entry changed during deletion: {entry_id}")
+            return jsonify({"error": "Entry was modified, please retry"}), 409
         logger.info(f"✅ Entry {entry_id} soft deleted")
         
         return jsonify({"status": "deleted", "entry_id": entry_id}), 200
@@ -362,6 +511,27 @@ def delete_entry(entry_id):
         logger.error(traceback.format_exc())
         return jsonify({"error": "Delete failed", "details": str(e)}), 500
 
+@entry_bp.route("/sweep-pending", methods=["POST"])
+def sweep_pending_entries():
+    """
+    Mark entries whose background job was lost (worker restart, timeout or
+    deploy) as failed. This endpoint can be called by a scheduled job.
+    """
+    # Admin authentication check
+    api_key = request.headers.get("X-API-Key")
+    if not api_key or api_key != os.environ.get("ADMIN_API_KEY"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        failed = fail_stale_pending_entries()
+        logger.info(f"🧹 Marked {failed} stale pending entries as failed")
+        return jsonify({"status": "success", "failed": failed}), 200
+
+    except Exception as e:
+        logger.error(f"❌ Error in POST /api/entry/sweep-pending: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
 # Alternative implementation of get_entries that doesn't require a composite index
 @entry_bp.route("/alternative", methods=["GET"])
 def get_entries_alternative():
@@ -389,8 +559,7 @@ def get_entries_alternative():
             sort_order = "desc"
         
         # Start with simpler query that doesn't require a composite index
-        # Just filter by deleted_flag
-        query = db.collection("entries").where("deleted_flag", "==", False)
+        query = get_db().collection("entries")
         
         # Execute query
         docs = query.stream()
@@ -433,7 +602,7 @@ def test_openai():
     """Test route for OpenAI integration."""
     try:
         prompt = "Say hello from Hatchling"
-        tags = get_ai_tags(prompt)
+        tags = get_or_compute_tags(prompt)
         return jsonify({"response": f"AI responded with: {tags}"})
     except Exception as e:
         logger.error(f"❌ OpenAI test failed: {str(e)}")
@@ -1,26 +1,317 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context
 from firebase_admin import firestore
+from utils.db import get_db
 import logging
 import csv
-import json
-import tempfile
 import os
+import re
+import orjson
+import itertools
+import hashlib
+import zlib
+import threading
+import tempfile
+import multiprocessing
 from datetime import datetime
 from utils.auth_middleware import require_role
+from utils.pdf_render import format_tags, render_entries_pdf
+from utils.helpers import parse_memory_date
 import io
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
 import requests
-from PIL import Image as PILImage
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 export_bp = Blueprint('export', __name__)
 
+# PDF image downloads run in parallel over pooled keep-alive connections
+_image_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="pdf-image")
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+_http.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+IMAGE_CHUNK_SIZE = 64 * 1024
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+# Media URLs the PDF embeds; signed URLs carry a query string after the
+# extension, and audio/video attachments are not downloaded at all
+_IMAGE_URL_RE = re.compile(r'\.(?:jpe?g|png|gif)(?:\?|$)', re.IGNORECASE)
+
+# PDF layout is CPU-bound, so it runs in worker processes rather than on
+# request threads; the pool is created on first use
+PDF_RENDER_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+PDF_RENDER_TIMEOUT = 60
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+# Formats served by export_entries; PDF has its own route
+VALID_EXPORT_FORMATS = frozenset(('csv', 'json'))
+
+# Documents fetched per Firestore round trip when exporting a query
+EXPORT_PAGE_SIZE = 500
+
+# Firestore's limit on array_contains_any values
+MAX_EXPORT_TAGS = 10
+
+# Fields the export filters read, fetched whatever else is projected
+_FILTER_FIELDS = ('author_id', 'privacy', 'date_of_memory', 'tags')
+
+# Fields the PDF renders
+PDF_EXPORT_FIELDS = ('date_of_memory', 'content', 'media_url', 'tags')
+
+def _stream_query_pages(query, start_after=None, page_size=EXPORT_PAGE_SIZE):
+    """
+    Iterate a query's documents page by page using start_after cursors, so
+    at most one page is held in memory at a time.
+    
+    The first page is fetched before returning, so query errors (such as a
+    missing index) surface in the request handler rather than mid-stream.
+    
+    Args:
+        query: Ordered Firestore query
+        start_after: Optional document snapshot to resume after
+        page_size: Documents per page
+        
+    Returns:
+        Iterator of document snapshots
+    """
+    def fetch(cursor):
+        page_query = query.limit(page_size)
+        if cursor is not None:
+            page_query = page_query.start_after(cursor)
+        return list(page_query.stream())
+
+    first_page = fetch(start_after)
+
+    def remaining_pages(page):
+        while len(page) == page_size:
+            page = fetch(page[-1])
+            yield from page
+
+    return itertools.chain(first_page, remaining_pages(first_page))
+
+def _memory_date_key(entry):
+    return entry.get('date_of_memory', '')
+
+def _doc_field(doc, field):
+    """Read one field from a document snapshot, or None if it is not set"""
+    try:
+        return doc.get(field)
+    except KeyError:
+        return None
+
+def _export_etag(user_id, version):
+    """
+    Strong ETag for an export: the request, the user and a version string
+    for the selected entries. The PDF prints the export date and CSV/JSON
+    may be gzip-encoded, so both are part of the tag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    args = sorted(request.args.items(multi=True))
+    digest.update(f"{request.path}|{args}|{user_id}|{datetime.now().date()}|{_accepts_gzip()}|{version}".encode())
+    return digest.hexdigest()
+
+def _not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+def _filter_entries(docs, user_id, start_date, end_date, privacy, filter_in_python, check_access=True, tags=None):
+    """
+    Convert documents to entry dicts, dropping the ones the user may not see.
+    
+    Args:
+        docs: Iterable of document snapshots
+        user_id: Requesting user
+        start_date: Optional inclusive lower date bound (YYYY-MM-DD)
+        end_date: Optional inclusive upper date bound (YYYY-MM-DD)
+        privacy: Optional privacy level to keep
+        filter_in_python: Whether date and privacy still need checking here
+            (False when the Firestore query already applied them)
+        check_access: Whether private entries of other authors can occur
+            (False when the query only matches entries the user may see)
+        tags: Optional tags; entries must carry at least one of them
+            (checked only when filter_in_python is set)
+        
+    Yields:
+        Entry dicts with entry_id set
+    """
+    if not (filter_in_python or check_access):
+        for doc in docs:
+            entry = doc.to_dict()
+            entry['entry_id'] = doc.id
+            yield entry
+        return
+        
+    for doc in docs:
+        # Decide from the individual fields first so documents that are
+        # dropped are never converted to a full dict
+        if filter_in_python and (start_date or end_date):
+            entry_date = _doc_field(doc, 'date_of_memory')
+            if not entry_date:
+                continue
+                
+            if start_date and entry_date < start_date:
+                continue
+                
+            if end_date and entry_date > end_date:
+                continue
+                
+        entry_privacy = _doc_field(doc, 'privacy')
+        
+        # Apply privacy filter
+        if filter_in_python and privacy and entry_privacy != privacy:
+            continue
+            
+        # Apply tag filter
+        if filter_in_python and tags and not set(_doc_field(doc, 'tags') or ()).intersection(tags):
+            continue
+            
+        # Skip entries user doesn't have permission to see
+        if check_access and (entry_privacy or 'private') == 'private' and _doc_field(doc, 'author_id') != user_id:
+            continue
+            
+        entry = doc.to_dict()
+        entry['entry_id'] = doc.id
+        yield entry
+
+def _load_export_entries(user_id, fields=None):
+    """
+    Fetch the entries selected by the export query parameters.
+    
+    Reads start_date, end_date, author_id, privacy, tags, entry_id,
+    entry_ids and page_token from the current request.
+    
+    Args:
+        user_id: Requesting user
+        fields: Optional fields to read; the fields the filters need are
+            always included. None reads whole documents.
+        
+    Returns:
+        Tuple of (iterable of entry dicts newest first, ETag, None), or
+        (None, None, response) when the request cannot be served or the
+        client's If-None-Match copy is still current (304)
+    """
+    # Stored dates are zero-padded ISO strings; the bounds are normalized the
+    # same way so that Firestore's string range follows date order
+    date_bounds = []
+    for name in ('start_date', 'end_date'):
+        value = request.args.get(name)
+        if value:
+            parsed = parse_memory_date(value)
+            if parsed is None:
+                return None, None, (jsonify({"error": f"Invalid {name}. Use YYYY-MM-DD."}), 400)
+            value = parsed.isoformat()
+        date_bounds.append(value)
+    start_date, end_date = date_bounds
+    author_id = request.args.get('author_id')
+    privacy = request.args.get('privacy')
+    entry_id = request.args.get('entry_id')
+    entry_ids = request.args.get('entry_ids')
+    page_token = request.args.get('page_token')
+    
+    # Comma-separated tags; an entry matches if it has any of them
+    tags = list(dict.fromkeys(tag.strip() for tag in request.args.get('tags', '').split(',') if tag.strip()))
+    if len(tags) > MAX_EXPORT_TAGS:
+        return None, None, (jsonify({"error": f"At most {MAX_EXPORT_TAGS} tags can be filtered on"}), 400)
+    
+    # Get entries from Firestore
+    db = get_db()
+    if fields is not None:
+        fields = list(dict.fromkeys(itertools.chain(_FILTER_FIELDS, fields)))
+    
+    # Handle specific entry_id or entry_ids
+    if entry_id:
+        # Get a single entry
+        doc = db.collection('entries').document(entry_id).get(field_paths=fields)
+        if not doc.exists:
+            return None, None, (jsonify({"error": f"Entry {entry_id} not found"}), 404)
+            
+        entries = [doc]
+    elif entry_ids:
+        # Get multiple specific entries in one batched read
+        ids_list = dict.fromkeys(id.strip() for id in entry_ids.split(',') if id.strip())
+        refs = [db.collection('entries').document(id) for id in ids_list]
+        entries = [doc for doc in db.get_all(refs, field_paths=fields) if doc.exists]
+    else:
+        # Query based on filters
+        query = db.collection('entries')
+        
+        # Apply filters
+        if author_id:
+            query = query.where('author_id', '==', author_id)
+        elif privacy != 'public':
+            # If not filtering by author and not requesting public entries,
+            # limit to entries the user has permission to see
+            query = query.where('author_id', '==', user_id)
+            
+        # Every entry the result can be drawn from, for the ETag below
+        scope = query.where('privacy', '==', 'public') if privacy == 'public' and not author_id else query
+            
+        # The per-entry permission check is only needed when the query can
+        # match another author's private entries
+        check_access = bool(author_id) and author_id != user_id and privacy in (None, '', 'private')
+            
+        # Date range, privacy and tags are filtered by Firestore
+        if start_date:
+            query = query.where('date_of_memory', '>=', start_date)
+        if end_date:
+            query = query.where('date_of_memory', '<=', end_date)
+        if privacy:
+            query = query.where('privacy', '==', privacy)
+        if tags:
+            query = query.where('tags', 'array_contains_any', tags)
+            
+        # Resume after page_token (an entry ID) when given
+        cursor = None
+        if page_token:
+            cursor = db.collection('entries').document(page_token).get()
+            if not cursor.exists:
+                return None, None, (jsonify({"error": "Invalid page_token"}), 400)
+                
+        # Document ID breaks ties between entries on the same day, so the
+        # start_after cursors used for paging are always unambiguous
+        query = query.order_by('date_of_memory', direction=firestore.Query.DESCENDING)\
+                     .order_by('__name__', direction=firestore.Query.DESCENDING)
+        
+        # Fingerprint the result with one count aggregation and one read:
+        # every entry write sets updated_at, so an edit anywhere in scope
+        # moves its newest value, and a deletion changes the count
+        counted = query.start_after(cursor) if cursor else query
+        count = counted.count().get()[0][0].value
+        newest = scope.order_by('updated_at', direction=firestore.Query.DESCENDING)\
+                      .select(['updated_at']).limit(1).stream()
+        newest = next(newest, None)
+        etag = _export_etag(user_id, f"{count}@{_doc_field(newest, 'updated_at') if newest else None}")
+        if request.if_none_match.contains(etag):
+            return None, None, _not_modified(etag)
+            
+        if fields is not None:
+            query = query.select(fields)
+        entries = _stream_query_pages(query, cursor)
+    
+    # Entries fetched by ID are already in hand, so they are fingerprinted
+    # directly; they still need the date, privacy and tag filters
+    filter_in_python = bool(entry_id or entry_ids)
+    if filter_in_python:
+        check_access = True
+        etag = _export_etag(user_id, "|".join(f"{doc.id}@{doc.update_time}" for doc in entries))
+        if request.if_none_match.contains(etag):
+            return None, None, _not_modified(etag)
+    
+    # Process and filter entries
+    filtered_entries = _filter_entries(
+        entries, user_id, start_date, end_date, privacy, filter_in_python, check_access, tags
+    )
+    
+    # Query results arrive newest first from Firestore's index; only the
+    # bounded set fetched by ID is sorted here
+    if filter_in_python:
+        filtered_entries = sorted(filtered_entries, key=_memory_date_key, reverse=True)
+    
+    return filtered_entries, etag, None
+
 @export_bp.route('', methods=['GET'])
 @export_bp.route('/', methods=['GET'])
 @require_role(['parent', 'co-parent', 'admin'])
@@ -34,21 +325,17 @@ def export_entries():
     - end_date: Filter entries until this date (YYYY-MM-DD)
     - author_id: Filter by specific author
     - privacy: Filter by privacy level
+    - tags: Only entries with any of these tags (comma-separated, at most 10)
     - entry_id: Export a single entry
     - entry_ids: Export multiple entries (comma-separated)
+    - page_token: Resume a filtered export after this entry ID
     """
     try:
         # Get query parameters
         export_format = request.args.get('format', 'csv').lower()
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        author_id = request.args.get('author_id')
-        privacy = request.args.get('privacy')
-        entry_id = request.args.get('entry_id')
-        entry_ids = request.args.get('entry_ids')
         
         # Validate format
-        if export_format not in ['csv', 'json']:
+        if export_format not in VALID_EXPORT_FORMATS:
             return jsonify({"error": "Invalid format. Use 'csv' or 'json'"}), 400
             
         # Get user ID from header
@@ -56,74 +343,12 @@ def export_entries():
         if not user_id:
             return jsonify({"error": "User ID is required"}), 400
             
-        # Get entries from Firestore
-        db = firestore.client()
-        
-        # Handle specific entry_id or entry_ids
-        if entry_id:
-            # Get a single entry
-            doc = db.collection('entries').document(entry_id).get()
-            if not doc.exists:
-                return jsonify({"error": f"Entry {entry_id} not found"}), 404
-                
-            entries = [doc]
-        elif entry_ids:
-            # Get multiple specific entries
-            ids_list = entry_ids.split(',')
-            entries = []
-            for id in ids_list:
-                doc = db.collection('entries').document(id.strip()).get()
-                if doc.exists:
-                    entries.append(doc)
-        else:
-            # Query based on filters
-            query = db.collection('entries').where('deleted_flag', '==', False)
-            
-            # Apply filters
-            if author_id:
-                query = query.where('author_id', '==', author_id)
-            elif privacy != 'public':
-                # If not filtering by author and not requesting public entries,
-                # limit to entries the user has permission to see
-                query = query.where('author_id', '==', user_id)
-                
-            entries = list(query.stream())
-        
-        # Process and filter entries
-        filtered_entries = []
-        
-        for doc in entries:
-            entry = doc.to_dict()
-            entry['entry_id'] = doc.id
-            
-            # Apply date filters if provided
-            if start_date or end_date:
-                entry_date = entry.get('date_of_memory')
-                if not entry_date:
-                    continue
-                    
-                if start_date and entry_date < start_date:
-                    continue
-                    
-                if end_date and entry_date > end_date:
-                    continue
-                    
-            # Apply privacy filter
-            if privacy and entry.get('privacy') != privacy:
-                continue
-                
-            # Check permissions based on privacy
-            entry_privacy = entry.get('privacy', 'private')
-            entry_author = entry.get('author_id')
-            
-            # Skip entries user doesn't have permission to see
-            if entry_privacy == 'private' and entry_author != user_id:
-                continue
-                
-            filtered_entries.append(entry)
-            
-        # Sort entries by date
-        filtered_entries.sort(key=lambda x: x.get('date_of_memory', ''), reverse=True)
+        # Fetch and filter entries; CSV only needs its own columns, JSON
+        # exports whole entries
+        fields = CSV_EXPORT_FIELDS if export_format == 'csv' else None
+        filtered_entries, etag, error_response = _load_export_entries(user_id, fields)
+        if error_response:
+            return error_response
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -131,86 +356,229 @@ def export_entries():
         
         # Export based on format
         if export_format == 'csv':
-            return export_as_csv(filtered_entries, filename)
+            response = export_as_csv(filtered_entries, filename)
         else:
-            return export_as_json(filtered_entries, filename)
+            response = export_as_json(filtered_entries, filename)
+            
+        response.set_etag(etag)
+        return response
             
     except Exception as e:
         logger.error(f"Export error: {str(e)}")
         return jsonify({"error": "Export failed", "details": str(e)}), 500
 
-def export_as_csv(entries, filename):
-    """Export entries as CSV file"""
-    try:
-        # Create a temporary file
-        csv_file = io.StringIO()
+def _iso(value):
+    """ISO 8601 string for Firestore timestamps; other values pass through"""
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def _download_image(media_url):
+    """
+    Download an image for the PDF export to a temporary file, so neither
+    this process nor the render worker holds the image bytes in memory.
+    
+    Returns:
+        Path of the downloaded image (the caller removes it), or None if
+        the server did not return 200
+        
+    Raises:
+        ValueError: If the image exceeds MAX_IMAGE_BYTES
+    """
+    with _http.get(media_url, stream=True, timeout=10) as response:
+        if response.status_code != 200:
+            return None
+        if int(response.headers.get('Content-Length') or 0) > MAX_IMAGE_BYTES:
+            raise ValueError(f"Image larger than {MAX_IMAGE_BYTES} bytes")
+        
+        fd, image_path = tempfile.mkstemp(prefix="pdf_image_")
+        try:
+            size = 0
+            with os.fdopen(fd, 'wb') as image_file:
+                for chunk in response.iter_content(chunk_size=IMAGE_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_IMAGE_BYTES:
+                        raise ValueError(f"Image larger than {MAX_IMAGE_BYTES} bytes")
+                    image_file.write(chunk)
+        except Exception:
+            os.remove(image_path)
+            raise
+        return image_path
+
+# Rows are batched into pieces of about this size before being written to
+# the response, rather than one small write per entry
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# gzip level for streamed exports; level 1 is nearly free on the CPU and
+# still shrinks repetitive CSV/JSON several times over
+GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "1"))
+
+def _accepts_gzip():
+    return request.accept_encodings['gzip'] > 0
+
+def _gzip_chunks(chunks):
+    """Compress a stream of str/bytes chunks into a gzip member on the fly"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def _streamed_export(chunks, mimetype, filename):
+    """
+    Wrap an export generator in a streamed download, gzip-encoded when
+    the client accepts it.
+    """
+    headers = {
+        'Content-Disposition': f'attachment; filename={filename}',
+        'Vary': 'Accept-Encoding'
+    }
+    if _accepts_gzip():
+        chunks = _gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
         
-        # Define CSV fields
-        fieldnames = ['entry_id', 'date_of_memory', 'content', 'author_id', 
-                     'privacy', 'tags', 'media_url', 'transcription', 
-                     'source_type', 'timestamp_created']
-                     
-        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-        writer.writeheader()
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+# CSV export columns, in order
+CSV_FIELDNAMES = ('entry_id', 'date_of_memory', 'content', 'author_id', 
+                  'privacy', 'tags', 'media_url', 'transcription', 
+                  'source_type', 'timestamp_created')
+
+# Stored fields behind the columns; entry_id is the document ID
+CSV_EXPORT_FIELDS = tuple(field for field in CSV_FIELDNAMES if field != 'entry_id')
+
+def _csv_row(entry):
+    """CSV_FIELDNAMES values of an entry as a tuple; keep the two in step"""
+    get = entry.get
+    return (
+        get('entry_id', ''),
+        get('date_of_memory', ''),
+        get('content', ''),
+        get('author_id', ''),
+        get('privacy', ''),
+        format_tags(get('tags')),
+        get('media_url', ''),
+        get('transcription', ''),
+        get('source_type', ''),
+        _iso(get('timestamp_created', ''))
+    )
+
+def export_as_csv(entries, filename):
+    """Export entries as a CSV file streamed to the client in STREAM_CHUNK_SIZE pieces"""
+    def generate():
+        # One buffer is reused, flushed whenever it fills up
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_FIELDNAMES)
         
-        # Write entries
-        for entry in entries:
-            # Convert tags list to string
-            if 'tags' in entry and isinstance(entry['tags'], list):
-                entry['tags'] = ', '.join(entry['tags'])
+        try:
+            for entry in entries:
+                # Write only the fields we want, positionally
+                writer.writerow(_csv_row(entry))
                 
-            # Convert timestamps to strings
-            if 'timestamp_created' in entry and hasattr(entry['timestamp_created'], 'timestamp'):
-                entry['timestamp_created'] = datetime.fromtimestamp(
-                    entry['timestamp_created'].timestamp()
-                ).isoformat()
+                if buffer.tell() >= STREAM_CHUNK_SIZE:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                    
+            # Remaining rows (or just the header)
+            if buffer.tell():
+                yield buffer.getvalue()
                 
-            # Write only the fields we want
-            row = {field: entry.get(field, '') for field in fieldnames}
-            writer.writerow(row)
-            
-        # Prepare the response
-        csv_file.seek(0)
-        return send_file(
-            io.BytesIO(csv_file.getvalue().encode()),
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=f"{filename}.csv"
-        )
-        
-    except Exception as e:
-        logger.error(f"CSV export error: {str(e)}")
-        raise
+        except Exception as e:
+            logger.error(f"CSV export error: {str(e)}")
+            raise
+
+    return _streamed_export(generate(), 'text/csv', f"{filename}.csv")
+
+def _json_default(value):
+    """
+    orjson fallback for values it cannot encode natively: Firestore
+    timestamps become ISO strings and anything else (references, geo
+    points) its str(), so one odd field cannot abort a download mid-stream
+    """
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+# Accept non-string keys in map fields rather than failing the export
+JSON_EXPORT_OPTIONS = orjson.OPT_NON_STR_KEYS
 
 def export_as_json(entries, filename):
-    """Export entries as JSON file"""
-    try:
-        # Process entries for JSON serialization
-        processed_entries = []
-        
-        for entry in entries:
-            # Convert timestamps to strings
-            if 'timestamp_created' in entry and hasattr(entry['timestamp_created'], 'timestamp'):
-                entry['timestamp_created'] = datetime.fromtimestamp(
-                    entry['timestamp_created'].timestamp()
-                ).isoformat()
+    """Export entries as a JSON file streamed to the client in STREAM_CHUNK_SIZE pieces"""
+    def generate():
+        try:
+            chunk = bytearray(b'{"entries":[')
+            for index, entry in enumerate(entries):
+                if index:
+                    chunk += b','
+                chunk += orjson.dumps(entry, default=_json_default, option=JSON_EXPORT_OPTIONS)
                 
-            processed_entries.append(entry)
+                if len(chunk) >= STREAM_CHUNK_SIZE:
+                    yield bytes(chunk)
+                    chunk.clear()
+                    
+            chunk += b']}'
+            yield bytes(chunk)
             
-        # Create JSON string
-        json_data = json.dumps({"entries": processed_entries}, indent=2)
-        
-        # Prepare the response
-        return send_file(
-            io.BytesIO(json_data.encode()),
-            mimetype='application/json',
-            as_attachment=True,
-            download_name=f"{filename}.json"
-        )
+        except Exception as e:
+            logger.error(f"JSON export error: {str(e)}")
+            raise
+
+    return _streamed_export(generate(), 'application/json', f"{filename}.json")
+
+def _get_pdf_pool():
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                # Spawned (not forked) so workers never inherit the gRPC
+                # channel or the request threads of this process
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=PDF_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _pdf_pool
+
+def _recycle_pdf_pool(pool):
+    """
+    Kill the workers of a pool whose render timed out, so the stuck render
+    stops using CPU and later exports don't queue behind it; the next
+    export starts a fresh pool. Other renders running in the old pool fail
+    with BrokenProcessPool.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    # The executor has no public way to stop a running task
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _render_pdf(entries, images, failed_images, exported_on):
+    """
+    Render the PDF in the worker pool.
+    
+    Returns:
+        Open binary file positioned at the start of the PDF
+    """
+    fd, pdf_path = tempfile.mkstemp(prefix="export_", suffix=".pdf")
+    os.close(fd)
+    try:
+        pool = _get_pdf_pool()
+        future = pool.submit(render_entries_pdf, entries, images, failed_images, exported_on, pdf_path)
+        try:
+            future.result(timeout=PDF_RENDER_TIMEOUT)
+        except FutureTimeoutError:
+            _recycle_pdf_pool(pool)
+            raise
         
-    except Exception as e:
-        logger.error(f"JSON export error: {str(e)}")
-        raise
+        pdf_file = open(pdf_path, 'rb')
+    finally:
+        os.remove(pdf_path)  # an open handle keeps the data readable
+    return pdf_file
 
 @export_bp.route('/pdf', methods=['GET'])
 @require_role(['parent', 'co-parent', 'admin'])
@@ -223,217 +591,59 @@ def export_as_pdf():
     - end_date: Filter entries until this date (YYYY-MM-DD)
     - author_id: Filter by specific author
     - privacy: Filter by privacy level
+    - tags: Only entries with any of these tags (comma-separated, at most 10)
     - entry_id: Export a single entry
     - entry_ids: Export multiple entries (comma-separated)
+    - page_token: Resume a filtered export after this entry ID
     """
     try:
-        # Get query parameters
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        author_id = request.args.get('author_id')
-        privacy = request.args.get('privacy')
-        entry_id = request.args.get('entry_id')
-        entry_ids = request.args.get('entry_ids')
-        
         # Get user ID from header
         user_id = request.headers.get('X-User-ID')
         if not user_id:
             return jsonify({"error": "User ID is required"}), 400
             
-        # Get entries from Firestore
-        db = firestore.client()
-        
-        # Handle specific entry_id or entry_ids
-        if entry_id:
-            # Get a single entry
-            doc = db.collection('entries').document(entry_id).get()
-            if not doc.exists:
-                return jsonify({"error": f"Entry {entry_id} not found"}), 404
-                
-            entries = [doc]
-        elif entry_ids:
-            # Get multiple specific entries
-            ids_list = entry_ids.split(',')
-            entries = []
-            for id in ids_list:
-                doc = db.collection('entries').document(id.strip()).get()
-                if doc.exists:
-                    entries.append(doc)
-        else:
-            # Query based on filters
-            query = db.collection('entries').where('deleted_flag', '==', False)
-            
-            # Apply filters
-            if author_id:
-                query = query.where('author_id', '==', author_id)
-            elif privacy != 'public':
-                # If not filtering by author and not requesting public entries,
-                # limit to entries the user has permission to see
-                query = query.where('author_id', '==', user_id)
-                
-            entries = list(query.stream())
+        # Fetch and filter entries
+        filtered_entries, etag, error_response = _load_export_entries(user_id, PDF_EXPORT_FIELDS)
+        if error_response:
+            return error_response
         
-        # Process and filter entries
-        filtered_entries = []
+        # Download all images in parallel, over pooled keep-alive connections,
+        # to temporary files that are removed once the PDF is rendered
+        filtered_entries = list(filtered_entries)
+        image_downloads = {
+            media_url: _image_pool.submit(_download_image, media_url)
+            for media_url in dict.fromkeys(entry.get('media_url') for entry in filtered_entries)
+            if media_url and _IMAGE_URL_RE.search(media_url)
+        }
         
-        for doc in entries:
-            entry = doc.to_dict()
-            entry['entry_id'] = doc.id
-            
-            # Apply date filters if provided
-            if start_date or end_date:
-                entry_date = entry.get('date_of_memory')
-                if not entry_date:
-                    continue
-                    
-                if start_date and entry_date < start_date:
-                    continue
-                    
-                if end_date and entry_date > end_date:
-                    continue
-                    
-            # Apply privacy filter
-            if privacy and entry.get('privacy') != privacy:
-                continue
-                
-            # Check permissions based on privacy
-            entry_privacy = entry.get('privacy', 'private')
-            entry_author = entry.get('author_id')
-            
-            # Skip entries user doesn't have permission to see
-            if entry_privacy == 'private' and entry_author != user_id:
-                continue
-                
-            filtered_entries.append(entry)
-            
-        # Sort entries by date
-        filtered_entries.sort(key=lambda x: x.get('date_of_memory', ''), reverse=True)
-        
-        # Generate PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        
-        # Create custom styles
-        title_style = ParagraphStyle(
-            'TitleStyle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor=colors.brown,
-            spaceAfter=12
-        )
-        
-        date_style = ParagraphStyle(
-            'DateStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.gray,
-            spaceAfter=6
-        )
-        
-        content_style = ParagraphStyle(
-            'ContentStyle',
-            parent=styles['Normal'],
-            fontSize=12,
-            spaceAfter=12
-        )
-        
-        tag_style = ParagraphStyle(
-            'TagStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.darkgray,
-            spaceAfter=20
-        )
-        
-        # Build PDF content
-        elements = []
-        
-        # Add title
-        elements.append(Paragraph("Hatchling Memories", title_style))
-        elements.append(Paragraph(f"Exported on {datetime.now().strftime('%B %d, %Y')}", date_style))
-        elements.append(Spacer(1, 0.25*inch))
-        
-        # Add entries
-        for entry in filtered_entries:
-            # Add date
-            date_str = entry.get('date_of_memory', 'Unknown date')
-            try:
-                # Try to format the date if it's in YYYY-MM-DD format
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                formatted_date = date_obj.strftime('%B %d, %Y')
-            except:
-                formatted_date = date_str
-                
-            elements.append(Paragraph(f"<b>{formatted_date}</b>", date_style))
-            
-            # Add content
-            content = entry.get('content', '')
-            if content:
-                elements.append(Paragraph(content, content_style))
-            
-            # Add media if available
-            media_url = entry.get('media_url')
-            if media_url:
+        images = {}
+        failed_images = set()
+        try:
+            for media_url, download in image_downloads.items():
                 try:
-                    # Create a temporary file for the image
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp:
-                        # Download the image
-                        response = requests.get(media_url, stream=True)
-                        if response.status_code == 200:
-                            # Save the image to the temporary file
-                            for chunk in response.iter_content(1024):
-                                temp.write(chunk)
-                            
-                            # Close the file
-                            temp.close()
-                            
-                            # Resize the image if needed
-                            img = PILImage.open(temp.name)
-                            width, height = img.size
-                            max_width = 5 * inch
-                            if width > max_width:
-                                ratio = max_width / width
-                                new_height = height * ratio
-                                img = img.resize((int(max_width), int(new_height)), PILImage.LANCZOS)
-                                img.save(temp.name)
-                            
-                            # Add the image to the PDF
-                            elements.append(Image(temp.name, width=min(width, max_width), height=None))
-                            elements.append(Spacer(1, 0.1*inch))
-                            
-                            # Clean up the temporary file
-                            os.unlink(temp.name)
+                    images[media_url] = download.result()
                 except Exception as e:
-                    logger.error(f"Error adding image to PDF: {str(e)}")
-                    elements.append(Paragraph(f"[Image could not be displayed: {media_url}]", content_style))
-            
-            # Add tags
-            tags = entry.get('tags', [])
-            if tags:
-                if isinstance(tags, list):
-                    tags_str = ", ".join(tags)
-                else:
-                    tags_str = tags
-                elements.append(Paragraph(f"Tags: {tags_str}", tag_style))
-            
-            elements.append(Spacer(1, 0.2*inch))
-        
-        # Build the PDF
-        doc.build(elements)
-        
-        # Prepare the response
-        buffer.seek(0)
+                    logger.error(f"Error downloading image for PDF: {str(e)}")
+                    failed_images.add(media_url)
+                    
+            # Lay out and build the PDF in a worker process
+            pdf_entries = [{field: entry.get(field) for field in PDF_EXPORT_FIELDS} for entry in filtered_entries]
+            pdf_file = _render_pdf(pdf_entries, images, failed_images, datetime.now().strftime('%B %d, %Y'))
+        finally:
+            for image_path in images.values():
+                if image_path:
+                    os.remove(image_path)
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"hatchling_memories_{timestamp}.pdf"
         
         return send_file(
-            buffer,
+            pdf_file,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=filename
+            download_name=filename,
+            etag=etag
         )
         
     except Exception as e:
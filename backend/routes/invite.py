@@ -1,17 +1,59 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from firebase_admin import firestore
+from utils.db import get_db
 import logging
-import uuid
+import secrets
 from datetime import datetime, timedelta
 from utils.auth_middleware import require_role
+from utils.sms import get_twilio_client
 import os
-from twilio.rest import Client
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 invite_bp = Blueprint('invite', __name__)
 
+# Independent Firestore reads are overlapped with the request's own writes
+_lookup_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="invite-lookup")
+
+# Invite SMS go out after the response; the pool size caps Twilio concurrency
+_sms_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="invite-sms")
+
+# Firestore's limit on writes in one batch
+MAX_BULK_INVITES = 500
+
+# Roles an invite can grant, in the order shown in error messages
+VALID_INVITE_ROLES = ('co-parent', 'caregiver')
+VALID_REVOKE_TYPES = frozenset(('invite', 'user'))
+
+# Roles whose access cannot be revoked
+PROTECTED_ROLES = frozenset(('parent', 'admin'))
+
+# Invite fields accept_invite reads
+ACCEPT_INVITE_FIELDS = ['phone_number', 'expires_at', 'status', 'role', 'inviter_id']
+
+# Higher rank wins when an invite is accepted by an existing user
+ROLE_RANK = {
+    'admin': 3,
+    'parent': 2,
+    'co-parent': 1,
+    'caregiver': 0
+}
+
+def _new_invite_data(invite_code, phone_number, role, inviter_id, name):
+    """Fields of a newly created, pending invite"""
+    return {
+        'code': invite_code,
+        'phone_number': phone_number,
+        'role': role,
+        'inviter_id': inviter_id,
+        'name': name,
+        'status': 'pending',
+        'created_at': firestore.SERVER_TIMESTAMP,
+        'expires_at': datetime.now() + timedelta(days=7)  # 7-day expiration
+    }
+
 @invite_bp.route('/send', methods=['POST'])
 @require_role(['parent', 'admin'])
 def send_invite():
@@ -45,9 +87,8 @@ def send_invite():
             return jsonify({"error": "Phone number is required"}), 400
             
         # Validate role
-        valid_roles = ['co-parent', 'caregiver']
-        if not role or role not in valid_roles:
-            return jsonify({"error": f"Invalid role. Must be one of: {', '.join(valid_roles)}"}), 400
+        if not role or role not in VALID_INVITE_ROLES:
+            return jsonify({"error": f"Invalid role. Must be one of: {', '.join(VALID_INVITE_ROLES)}"}), 400
             
         # Get user ID from header
         user_id = request.headers.get('X-User-ID')
@@ -55,34 +96,26 @@ def send_invite():
             return jsonify({"error": "User ID is required"}), 400
             
         # Generate invite code
-        invite_code = str(uuid.uuid4())[:8]
+        invite_code = secrets.token_urlsafe(6)
         
         # Store invite in Firestore
-        db = firestore.client()
+        db = get_db()
         invite_ref = db.collection('invites').document(invite_code)
         
-        invite_data = {
-            'code': invite_code,
-            'phone_number': phone_number,
-            'role': role,
-            'inviter_id': user_id,
-            'name': name,
-            'status': 'pending',
-            'created_at': firestore.SERVER_TIMESTAMP,
-            'expires_at': datetime.now() + timedelta(days=7)  # 7-day expiration
-        }
+        # Fetch the inviter's name for the SMS while the invite is written
+        inviter_doc_future = _lookup_pool.submit(db.collection('users').document(user_id).get)
+        
+        invite_data = _new_invite_data(invite_code, phone_number, role, user_id, name)
         
         invite_ref.set(invite_data)
         logger.info(f"Created invite {invite_code} for {phone_number} with role {role}")
         
-        # Send SMS invitation
-        try:
-            send_invite_sms(phone_number, invite_code, role, name, user_id, message)
-            invite_ref.update({'sms_sent': True})
-        except Exception as e:
-            logger.error(f"Failed to send SMS invite: {str(e)}")
-            invite_ref.update({'sms_sent': False, 'sms_error': str(e)})
-            # Continue anyway - we'll show the invite code in the response
+        # Send SMS invitation in the background; the invite is already stored
+        # and its code is in the response, so the client need not wait on Twilio
+        _sms_pool.submit(
+            _send_and_mark, invite_ref, phone_number, invite_code, role, name,
+            user_id, message, inviter_doc_future
+        )
         
         return jsonify({
             "status": "success",
@@ -94,6 +127,75 @@ def send_invite():
         logger.error(f"Error sending invite: {str(e)}")
         return jsonify({"error": "Failed to send invitation", "details": str(e)}), 500
 
+@invite_bp.route('/send_bulk', methods=['POST'])
+@require_role(['parent', 'admin'])
+def send_bulk_invites():
+    """
+    Send several invitations at once; all invites are stored in one batched
+    write and their SMS go out in the background.
+    
+    Required fields:
+    - invites: List of objects with phone_number, role and optionally
+      name and message (see /send), at most 500
+    """
+    try:
+        # Get request data
+        data = request.json
+        invites = data.get('invites') if isinstance(data, dict) else None
+        if not invites or not isinstance(invites, list):
+            return jsonify({"error": "A non-empty list of invites is required"}), 400
+            
+        if len(invites) > MAX_BULK_INVITES:
+            return jsonify({"error": f"At most {MAX_BULK_INVITES} invites can be sent at once"}), 400
+            
+        # Validate every invite before writing any of them
+        for index, invite in enumerate(invites):
+            if not isinstance(invite, dict) or not invite.get('phone_number'):
+                return jsonify({"error": f"Phone number is required (invite {index})"}), 400
+            if invite.get('role') not in VALID_INVITE_ROLES:
+                return jsonify({"error": f"Invalid role in invite {index}. Must be one of: {', '.join(VALID_INVITE_ROLES)}"}), 400
+                
+        # Get user ID from header
+        user_id = request.headers.get('X-User-ID')
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
+            
+        db = get_db()
+        
+        # Fetch the inviter's name for the SMS while the invites are written
+        inviter_doc_future = _lookup_pool.submit(db.collection('users').document(user_id).get)
+        
+        # Store all invites in one commit
+        batch = db.batch()
+        created = []
+        for invite in invites:
+            invite_code = secrets.token_urlsafe(6)
+            invite_ref = db.collection('invites').document(invite_code)
+            batch.set(invite_ref, _new_invite_data(
+                invite_code, invite['phone_number'], invite['role'], user_id, invite.get('name', 'Someone')
+            ))
+            created.append((invite_ref, invite_code, invite))
+            
+        batch.commit()
+        logger.info(f"Created {len(created)} invites for {user_id} in one batch")
+        
+        # Send SMS invitations in the background
+        for invite_ref, invite_code, invite in created:
+            _sms_pool.submit(
+                _send_and_mark, invite_ref, invite['phone_number'], invite_code, invite['role'],
+                invite.get('name', 'Someone'), user_id, invite.get('message', ''), inviter_doc_future
+            )
+            
+        return jsonify({
+            "status": "success",
+            "message": f"{len(created)} invitations sent",
+            "invite_codes": [invite_code for _, invite_code, _ in created]
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error sending bulk invites: {str(e)}")
+        return jsonify({"error": "Failed to send invitations", "details": str(e)}), 500
+
 @invite_bp.route('/accept', methods=['POST'])
 def accept_invite():
     """
@@ -118,9 +220,9 @@ def accept_invite():
             return jsonify({"error": "Invite code and phone number are required"}), 400
             
         # Check if invite exists and is valid
-        db = firestore.client()
+        db = get_db()
         invite_ref = db.collection('invites').document(invite_code)
-        invite_doc = invite_ref.get()
+        invite_doc = invite_ref.get(field_paths=ACCEPT_INVITE_FIELDS)
         
         if not invite_doc.exists:
             return jsonify({"error": "Invalid invite code"}), 404
@@ -141,7 +243,7 @@ def accept_invite():
             
         # Create or update user account
         users_ref = db.collection('users')
-        query = users_ref.where('phone_number', '==', phone_number).limit(1)
+        query = users_ref.where('phone_number', '==', phone_number).select(['role']).limit(1)
         user_docs = query.get()
         
         if user_docs:
@@ -154,14 +256,7 @@ def accept_invite():
             current_role = user_data.get('role', 'caregiver')
             new_role = invite_data.get('role', 'caregiver')
             
-            role_hierarchy = {
-                'admin': 3,
-                'parent': 2,
-                'co-parent': 1,
-                'caregiver': 0
-            }
-            
-            if role_hierarchy.get(new_role, 0) > role_hierarchy.get(current_role, 0):
+            if ROLE_RANK.get(new_role, 0) > ROLE_RANK.get(current_role, 0):
                 users_ref.document(user_id).update({'role': new_role})
                 logger.info(f"Updated user {user_id} role from {current_role} to {new_role}")
         else:
@@ -221,7 +316,7 @@ def revoke_invite():
             return jsonify({"error": "Type and ID are required"}), 400
             
         # Validate type
-        if revoke_type not in ['invite', 'user']:
+        if revoke_type not in VALID_REVOKE_TYPES:
             return jsonify({"error": "Type must be 'invite' or 'user'"}), 400
             
         # Get user ID from header
@@ -229,7 +324,7 @@ def revoke_invite():
         if not user_id:
             return jsonify({"error": "User ID is required"}), 400
             
-        db = firestore.client()
+        db = get_db()
         
         if revoke_type == 'invite':
             # Revoke invitation
@@ -241,14 +336,10 @@ def revoke_invite():
                 
             invite_data = invite_doc.to_dict()
             
-            # Check if user has permission to revoke
-            if invite_data.get('inviter_id') != user_id:
-                # Check if user is admin
-                user_ref = db.collection('users').document(user_id)
-                user_doc = user_ref.get()
-                
-                if not user_doc.exists or user_doc.to_dict().get('role') != 'admin':
-                    return jsonify({"error": "You don't have permission to revoke this invite"}), 403
+            # Check if user has permission to revoke (inviter or admin; the
+            # role was already read by require_role)
+            if invite_data.get('inviter_id') != user_id and g.user_role != 'admin':
+                return jsonify({"error": "You don't have permission to revoke this invite"}), 403
             
             # Update invite status
             invite_ref.update({
@@ -272,17 +363,12 @@ def revoke_invite():
                 
             target_user_data = target_user_doc.to_dict()
             
-            # Check if user has permission to revoke
-            if target_user_data.get('invited_by') != user_id:
-                # Check if user is admin
-                user_ref = db.collection('users').document(user_id)
-                user_doc = user_ref.get()
-                
-                if not user_doc.exists or user_doc.to_dict().get('role') != 'admin':
-                    return jsonify({"error": "You don't have permission to revoke this user's access"}), 403
+            # Check if user has permission to revoke (inviter or admin)
+            if target_user_data.get('invited_by') != user_id and g.user_role != 'admin':
+                return jsonify({"error": "You don't have permission to revoke this user's access"}), 403
             
             # Cannot revoke parent or admin access
-            if target_user_data.get('role') in ['parent', 'admin']:
+            if target_user_data.get('role') in PROTECTED_ROLES:
                 return jsonify({"error": "Cannot revoke parent or admin access"}), 400
             
             # Update user status
@@ -301,8 +387,21 @@ def revoke_invite():
         logger.error(f"Error revoking access: {str(e)}")
         return jsonify({"error": "Failed to revoke access", "details": str(e)}), 500
 
-def send_invite_sms(phone_number, invite_code, role, name, inviter_id, custom_message=""):
-    """Send SMS invitation using Twilio"""
+def _send_and_mark(invite_ref, phone_number, invite_code, role, name, inviter_id, message, inviter_doc_future):
+    """Send an invite SMS and record the outcome on the invite document"""
+    try:
+        send_invite_sms(phone_number, invite_code, role, name, inviter_id, message,
+                        inviter_doc=inviter_doc_future.result())
+        invite_ref.update({'sms_sent': True})
+    except Exception as e:
+        logger.error(f"Failed to send SMS invite: {str(e)}")
+        try:
+            invite_ref.update({'sms_sent': False, 'sms_error': str(e)})
+        except Exception as update_error:
+            logger.error(f"Failed to record SMS failure for invite {invite_code}: {str(update_error)}")
+
+def send_invite_sms(phone_number, invite_code, role, name, inviter_id, custom_message="", inviter_doc=None):
+    """Send SMS invitation using Twilio; inviter_doc is fetched if not given"""
     try:
         # Get Twilio credentials from environment
         account_sid = os.environ.get('TWILIO_SID')
@@ -313,9 +412,8 @@ def send_invite_sms(phone_number, invite_code, role, name, inviter_id, custom_me
             raise ValueError("Twilio credentials not configured")
             
         # Get inviter name
-        db = firestore.client()
-        inviter_ref = db.collection('users').document(inviter_id)
-        inviter_doc = inviter_ref.get()
+        if inviter_doc is None:
+            inviter_doc = get_db().collection('users').document(inviter_id).get()
         
         inviter_name = "Someone"
         if inviter_doc.exists:
@@ -334,7 +432,7 @@ def send_invite_sms(phone_number, invite_code, role, name, inviter_id, custom_me
         message += f"Use code {invite_code} at {base_url} to accept."
         
         # Send message
-        client = Client(account_sid, auth_token)
+        client = get_twilio_client()
         client.messages.create(
             body=message,
             from_=from_number,
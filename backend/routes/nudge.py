@@ -2,7 +2,11 @@ from flask import Blueprint, request, jsonify
 import logging
 import os
 from datetime import datetime, timedelta
-from utils import firebase
+from concurrent.futures import ThreadPoolExecutor
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition
+from utils.db import get_db
+from utils.ttl_cache import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -11,6 +15,165 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 nudge_bp = Blueprint('nudge', __name__)
 
+# Days without an entry before a user is nudged, by nudge frequency
+NUDGE_THRESHOLD_DAYS = {
+    'daily': 2,
+    'weekly': 7,
+    'occasionally': 14
+}
+VALID_NUDGE_FREQUENCIES = frozenset(NUDGE_THRESHOLD_DAYS)
+INVALID_FREQUENCY_ERROR = f"Invalid frequency. Must be one of: {', '.join(NUDGE_THRESHOLD_DAYS)}"
+
+# Settings change rarely, so GETs are served from a short-lived
+# per-process cache; a POST clears the user's entry in this worker
+_settings_cache = TTLCache(maxsize=10000, ttl=60)
+
+# User fields an inactivity run reads
+NUDGE_USER_FIELDS = ['nudge_frequency', 'last_entry_ts', 'phone_number']
+
+# Per-user last-entry lookups are independent, so they run concurrently
+_lookup_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="nudge-lookup")
+
+def _last_entry(db, user_id):
+    """Most recent entry snapshot by user_id, or None if they have none"""
+    entries_ref = db.collection('entries')
+    recent_entries = entries_ref.where('author_id', '==', user_id).order_by('timestamp_created', direction='DESCENDING').select(['timestamp_created']).limit(1).stream()
+    
+    return next(recent_entries, None)
+
+# Firestore's limit on writes in one batch
+MAX_BATCH_WRITES = 500
+
+def _commit_in_batches(db, method, writes):
+    """Apply (document_ref, data) writes with WriteBatch.<method>, up to MAX_BATCH_WRITES per commit"""
+    for start in range(0, len(writes), MAX_BATCH_WRITES):
+        batch = db.batch()
+        for doc_ref, data in writes[start:start + MAX_BATCH_WRITES]:
+            getattr(batch, method)(doc_ref, data)
+        batch.commit()
+
+def _backfill_last_entry(db, user_ref, last_entry_ts, read_time):
+    """
+    Save a looked-up last_entry_ts unless the user changed since read_time;
+    an entry written meanwhile has already set a newer value.
+    """
+    try:
+        user_ref.update({'last_entry_ts': last_entry_ts}, option=db.write_option(last_update_time=read_time))
+    except FailedPrecondition:
+        logger.info(f"Skipped last_entry_ts backfill for changed user: {user_ref.id}")
+
+def _send_nudges(db, nudges):
+    """
+    Record and send a set of nudges, batching the nudge log writes.
+    
+    Args:
+        db: Firestore client
+        nudges: (user_id, nudge_type, user_data) tuples
+        
+    Returns:
+        Number of nudges sent
+    """
+    deliverable = []
+    for user_id, nudge_type, user_data in nudges:
+        phone_number = user_data.get('phone_number')
+        
+        if not phone_number:
+            logger.error(f"No phone number for user: {user_id}")
+            continue
+        
+        deliverable.append((db.collection('nudges').document(), user_id, nudge_type, phone_number))
+    
+    # Log the nudges
+    _commit_in_batches(db, 'set', [
+        (nudge_ref, {
+            'user_id': user_id,
+            'type': nudge_type,
+            'timestamp': firestore.SERVER_TIMESTAMP,
+            'status': 'pending'
+        })
+        for nudge_ref, user_id, nudge_type, _ in deliverable
+    ])
+    
+    sent = []
+    for nudge_ref, user_id, nudge_type, phone_number in deliverable:
+        # TODO: Implement actual sending via Twilio or other service
+        # For now, just log it
+        logger.info(f"Would send {nudge_type} nudge to user {user_id} at {phone_number}")
+        sent.append(nudge_ref)
+    
+    # Update the nudge records
+    _commit_in_batches(db, 'update', [(nudge_ref, {'status': 'sent'}) for nudge_ref in sent])
+    
+    return len(sent)
+
+# Inactivity runs happen after the response, one at a time
+_run_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nudge-run")
+
+def _process_inactivity_nudges():
+    """
+    Nudge opted-in users who haven't created entries in a while.
+    
+    Returns:
+        Number of nudges sent, or None if the run failed
+    """
+    try:
+        db = get_db()
+        
+        # Find users who haven't created entries in a while but have opted in for nudges;
+        # the date thresholds are calculated once for the whole run
+        now = datetime.now()
+        threshold_dates = {
+            frequency: now - timedelta(days=days)
+            for frequency, days in NUDGE_THRESHOLD_DAYS.items()
+        }
+        
+        # Get users who have opted in for nudges
+        users_ref = db.collection('users')
+        opted_in_users = [(user.id, user.to_dict(), user.update_time) for user in users_ref.where('nudge_opt_in', '==', True).select(NUDGE_USER_FIELDS).stream()]
+        
+        # Entry writes keep last_entry_ts on the user; only users without it
+        # (no entries yet, or none since it was added) need an entries query
+        unknown_ids = [user_id for user_id, user_data, _ in opted_in_users if user_data.get('last_entry_ts') is None]
+        looked_up = dict(zip(unknown_ids, _lookup_pool.map(lambda user_id: _last_entry(db, user_id), unknown_ids)))
+        
+        due_nudges = []
+        backfill = []
+        for user_id, user_data, read_time in opted_in_users:
+            frequency = user_data.get('nudge_frequency', 'weekly')
+            threshold_date = threshold_dates.get(frequency, threshold_dates['weekly'])
+            
+            last_entry_time = user_data.get('last_entry_ts')
+            if last_entry_time is None:
+                last_entry_doc = looked_up[user_id]
+                if last_entry_doc is None:
+                    # No entries yet, send a welcome nudge
+                    due_nudges.append((user_id, 'welcome', user_data))
+                    continue
+                
+                last_entry = last_entry_doc.to_dict()
+                last_entry_time = last_entry.get('timestamp_created')
+                backfill.append((users_ref.document(user_id), last_entry_time, read_time))
+            
+            # Convert Firestore timestamp to datetime if needed
+            if hasattr(last_entry_time, 'timestamp'):
+                last_entry_time = datetime.fromtimestamp(last_entry_time.timestamp())
+            
+            if last_entry_time < threshold_date:
+                # User is inactive, send a nudge
+                due_nudges.append((user_id, 'inactivity', user_data))
+        
+        # Save the looked-up times so later runs can skip the query; each write
+        # is conditional on the user snapshot, so it can't clobber a newer entry
+        list(_lookup_pool.map(lambda write: _backfill_last_entry(db, *write), backfill))
+        
+        nudges_sent = _send_nudges(db, due_nudges)
+        logger.info(f"Processed inactivity nudges: {nudges_sent} sent")
+        return nudges_sent
+        
+    except Exception as e:
+        logger.error(f"Error processing inactivity nudges: {str(e)}")
+        return None
+
 @nudge_bp.route('/settings', methods=['GET', 'POST'])
 def nudge_settings():
     """
@@ -21,12 +184,16 @@ def nudge_settings():
     if not user_id:
         return jsonify({"error": "User ID is required"}), 400
     
-    db = firebase.db
+    db = get_db()
     user_ref = db.collection('users').document(user_id)
     
     if request.method == 'GET':
+        cached = _settings_cache.get(user_id)
+        if cached is not None:
+            return jsonify(cached), 200
+        
         # Get current nudge settings
-        user_doc = user_ref.get()
+        user_doc = user_ref.get(field_paths=['nudge_opt_in', 'nudge_frequency'])
         if not user_doc.exists:
             return jsonify({"error": "User not found"}), 404
         
@@ -35,6 +202,7 @@ def nudge_settings():
             'nudge_opt_in': user_data.get('nudge_opt_in', False),
             'nudge_frequency': user_data.get('nudge_frequency', 'weekly')
         }
+        _settings_cache.set(user_id, nudge_settings)
         
         return jsonify(nudge_settings), 200
     
@@ -49,9 +217,8 @@ def nudge_settings():
         nudge_frequency = data.get('nudge_frequency')
         
         # Validate frequency
-        valid_frequencies = ['daily', 'weekly', 'occasionally']
-        if nudge_frequency and nudge_frequency not in valid_frequencies:
-            return jsonify({"error": f"Invalid frequency. Must be one of: {', '.join(valid_frequencies)}"}), 400
+        if nudge_frequency and nudge_frequency not in VALID_NUDGE_FREQUENCIES:
+            return jsonify({"error": INVALID_FREQUENCY_ERROR}), 400
         
         # Update only provided fields
         update_data = {}
@@ -62,6 +229,7 @@ def nudge_settings():
         
         if update_data:
             user_ref.update(update_data)
+            _settings_cache.pop(user_id)
             logger.info(f"Updated nudge settings for user {user_id}: {update_data}")
             return jsonify({"status": "success", "message": "Nudge settings updated"}), 200
         else:
@@ -72,6 +240,9 @@ def send_nudge():
     """
     Send a nudge to users based on inactivity or other triggers.
     This endpoint can be called by a scheduled job.
+    
+    Inactivity nudges are processed in the background; the response is
+    202 as soon as the run is queued.
     """
     # Admin authentication check
     api_key = request.headers.get('X-API-Key')
@@ -79,8 +250,6 @@ def send_nudge():
         return jsonify({"error": "Unauthorized"}), 401
     
     try:
-        db = firebase.db
-        
         # Get nudge type from request
         data = request.json
         if not data:
@@ -89,54 +258,13 @@ def send_nudge():
         nudge_type = data.get('type', 'inactivity')
         
         if nudge_type == 'inactivity':
-            # Find users who haven't created entries in a while but have opted in for nudges
-            threshold_days = {
-                'daily': 2,
-                'weekly': 7,
-                'occasionally': 14
-            }
-            
-            # Get users who have opted in for nudges
-            users_ref = db.collection('users')
-            opted_in_users = users_ref.where('nudge_opt_in', '==', True).stream()
-            
-            nudges_sent = 0
-            for user in opted_in_users:
-                user_data = user.to_dict()
-                user_id = user.id
-                frequency = user_data.get('nudge_frequency', 'weekly')
-                days_threshold = threshold_days.get(frequency, 7)
-                
-                # Calculate the date threshold based on frequency
-                threshold_date = datetime.now() - timedelta(days=days_threshold)
-                
-                # Check user's last activity
-                entries_ref = db.collection('entries')
-                recent_entries = entries_ref.where('author_id', '==', user_id).order_by('timestamp_created', direction='DESCENDING').limit(1).stream()
-                
-                recent_entry_list = list(recent_entries)
-                if not recent_entry_list:
-                    # No entries yet, send a welcome nudge
-                    send_nudge_to_user(user_id, 'welcome')
-                    nudges_sent += 1
-                else:
-                    last_entry = recent_entry_list[0].to_dict()
-                    last_entry_time = last_entry.get('timestamp_created')
-                    
-                    # Convert Firestore timestamp to datetime if needed
-                    if hasattr(last_entry_time, 'timestamp'):
-                        last_entry_time = datetime.fromtimestamp(last_entry_time.timestamp())
-                    
-                    if last_entry_time < threshold_date:
-                        # User is inactive, send a nudge
-                        send_nudge_to_user(user_id, 'inactivity')
-                        nudges_sent += 1
+            # The run reads every opted-in user, so it happens off the request
+            _run_pool.submit(_process_inactivity_nudges)
             
             return jsonify({
-                "status": "success", 
-                "message": f"Processed inactivity nudges", 
-                "nudges_sent": nudges_sent
-            }), 200
+                "status": "accepted", 
+                "message": "Inactivity nudges queued"
+            }), 202
             
         elif nudge_type == 'tag':
             # Send tag-based nudges (e.g., "You haven't added any 'milestone' memories lately")
@@ -159,47 +287,32 @@ def send_nudge():
         logger.error(f"Error sending nudges: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
-def send_nudge_to_user(user_id, nudge_type):
+def send_nudge_to_user(user_id, nudge_type, user_data=None):
     """
     Send a nudge to a specific user.
     This would typically integrate with Twilio for SMS or use another notification method.
+    
+    Args:
+        user_id: ID of the user to nudge
+        nudge_type: Kind of nudge, e.g. 'welcome' or 'inactivity'
+        user_data: The user's document data if the caller already has it;
+            fetched from Firestore otherwise
     """
     try:
-        # Get user data
-        db = firebase.db
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
+        db = get_db()
         
-        if not user_doc.exists:
-            logger.error(f"User not found for nudge: {user_id}")
-            return False
-        
-        user_data = user_doc.to_dict()
-        phone_number = user_data.get('phone_number')
-        
-        if not phone_number:
-            logger.error(f"No phone number for user: {user_id}")
-            return False
-        
-        # Log the nudge
-        nudge_ref = db.collection('nudges').document()
-        nudge_ref.set({
-            'user_id': user_id,
-            'type': nudge_type,
-            'timestamp': firebase.firestore.SERVER_TIMESTAMP,
-            'status': 'pending'
-        })
-        
-        # TODO: Implement actual sending via Twilio or other service
-        # For now, just log it
-        logger.info(f"Would send {nudge_type} nudge to user {user_id} at {phone_number}")
-        
-        # Update the nudge record
-        nudge_ref.update({
-            'status': 'sent'
-        })
+        # Get user data
+        if user_data is None:
+            user_ref = db.collection('users').document(user_id)
+            user_doc = user_ref.get(field_paths=['phone_number'])
+            
+            if not user_doc.exists:
+                logger.error(f"User not found for nudge: {user_id}")
+                return False
+            
+            user_data = user_doc.to_dict()
         
-        return True
+        return _send_nudges(db, [(user_id, nudge_type, user_data)]) == 1
         
     except Exception as e:
         logger.error(f"Error sending nudge to user {user_id}: {str(e)}")
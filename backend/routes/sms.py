@@ -1,10 +1,16 @@
 from flask import Blueprint, request, jsonify
 from firebase_admin import firestore
-from utils.openai_client import get_ai_tags
+from utils.db import get_db
+from utils.tag_cache import get_or_compute_tags
+from utils.firestore_writes import queue_update
+from utils.ttl_cache import TTLCache
+from utils.helpers import parse_memory_date, normalize_phone_number
+from google.api_core.exceptions import FailedPrecondition
 import logging
 import traceback
-from datetime import datetime
+from datetime import date, datetime
 import re
+import json
 import random
 import string
 import os
@@ -19,10 +25,13 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 sms_bp = Blueprint("sms", __name__)
-db = firestore.client()
 
-# Store verification codes in memory (in production, use a more persistent solution)
-verification_codes = {}
+# Verification codes are valid for 30 minutes
+VERIFICATION_CODE_TTL_SECONDS = 1800
+
+# Recently sent verification codes by phone number; Firestore keeps a copy
+# for codes sent by another worker
+verification_codes = TTLCache(maxsize=10000, ttl=VERIFICATION_CODE_TTL_SECONDS)
 
 # Initialize Twilio client
 try:
@@ -37,6 +46,18 @@ except Exception as e:
     twilio_client = None
     twilio_phone_number = None
 
+# User fields the webhook reads
+SMS_USER_FIELDS = ['phone_number', 'subscription_active']
+
+def _constant_json_response(payload, status):
+    """Pre-serialize a fixed JSON body as a Flask (body, status, headers) tuple."""
+    return json.dumps(payload).encode("utf-8"), status, {"Content-Type": "application/json"}
+
+# Fixed webhook replies, serialized once at import
+_MISSING_FIELDS_RESPONSE = _constant_json_response({"error": "Missing required fields: From or Body"}, 400)
+_USER_NOT_FOUND_RESPONSE = _constant_json_response({"status": "unprocessed", "reason": "user_not_found"}, 200)
+_NO_SUBSCRIPTION_RESPONSE = _constant_json_response({"status": "rejected", "reason": "no_active_subscription"}, 200)
+
 # Check if we're in development mode
 DEV_MODE = os.environ.get('DEV_MODE', 'false').lower() == 'true'
 if DEV_MODE:
@@ -65,44 +86,50 @@ def sms_webhook():
         # Validate required fields
         if not phone_number or not message_body:
             logger.warning("Missing required SMS fields")
-            return jsonify({"error": "Missing required fields: From or Body"}), 400
+            return _MISSING_FIELDS_RESPONSE
         
         # Log the incoming message
         logger.info(f"📩 SMS received from {phone_number}: {message_body[:50]}...")
         
         # Look up user by phone number
-        user_query = db.collection("users").where("phone_number", "==", phone_number).limit(1).stream()
-        user_docs = list(user_query)
+        user_doc = _get_user_by_phone(phone_number)
         
-        if not user_docs:
+        if user_doc is None:
             logger.warning(f"No user found with phone number: {phone_number}")
             # Store the message anyway for future processing
-            db.collection("unprocessed_sms").add({
+            get_db().collection("unprocessed_sms").document().create({
                 "phone_number": phone_number,
                 "message": message_body,
                 "message_id": message_id,
                 "timestamp": firestore.SERVER_TIMESTAMP,
                 "processed": False
             })
-            return jsonify({"status": "unprocessed", "reason": "user_not_found"}), 200
+            return _USER_NOT_FOUND_RESPONSE
         
-        user_doc = user_docs[0]
         user_id = user_doc.id
         user_data = user_doc.to_dict()
         
         # Check if user has an active subscription
         if not user_data.get("subscription_active", False):
             logger.warning(f"User {user_id} does not have an active subscription")
-            return jsonify({"status": "rejected", "reason": "no_active_subscription"}), 200
+            return _NO_SUBSCRIPTION_RESPONSE
+        
+        # MMS attachments are copied to storage after the reply, so the
+        # webhook answers within Twilio's timeout
+        media_urls = [
+            request.form[f"MediaUrl{i}"]
+            for i in range(int(request.form.get("NumMedia", 0) or 0))
+            if request.form.get(f"MediaUrl{i}")
+        ]
         
         # Process the message to extract date and content
         date_of_memory, content = extract_date_and_content(message_body)
         
-        # Generate AI tags if content is substantial
+        # Generate tags; short messages get keyword tags without an OpenAI call
         tags = []
-        if len(content) >= 10:
+        if content:
             try:
-                tags = get_ai_tags(content)
+                tags = get_or_compute_tags(content)
                 logger.info(f"🧠 AI tags generated for SMS: {tags}")
             except Exception as e:
                 logger.error(f"❌ AI tag generation failed for SMS: {str(e)}")
@@ -115,9 +142,12 @@ def sms_webhook():
             "date_of_memory": date_of_memory,
             "privacy": "private",  # Default to private for SMS entries
             "tags": tags,
+            "media_url": media_urls[0] if media_urls else None,
+            "media_urls": media_urls,
             "source_type": "sms",
+            "processing_status": "pending" if media_urls else "done",
             "timestamp_created": firestore.SERVER_TIMESTAMP,
-            "deleted_flag": False,
+            "updated_at": firestore.SERVER_TIMESTAMP,
             "sms_metadata": {
                 "phone_number": phone_number,
                 "message_id": message_id,
@@ -126,12 +156,21 @@ def sms_webhook():
         }
         
         # Save to Firestore
-        doc_ref = db.collection("entries").add(entry)
-        entry_id = doc_ref[1].id
+        doc_ref = get_db().collection("entries").document()
+        doc_ref.create(entry)
+        entry_id = doc_ref.id
         logger.info(f"✅ SMS entry created: {entry_id} for user {user_id}")
         
+        if media_urls:
+            # Imported here so the webhook module loads without Firebase Storage configured
+            from utils.tasks import enqueue_sms_media
+            enqueue_sms_media(entry_id, media_urls, user_id)
+        
+        # Kept on the user for the inactivity nudge run, so it need not query entries
+        queue_update(get_db().collection("users").document(user_id), {"last_entry_ts": firestore.SERVER_TIMESTAMP})
+        
         # Record SMS processing success
-        db.collection("processed_sms").add({
+        get_db().collection("processed_sms").document().create({
             "phone_number": phone_number,
             "message_id": message_id,
             "entry_id": entry_id,
@@ -150,6 +189,30 @@ def sms_webhook():
         logger.error(traceback.format_exc())
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
+def _get_user_by_phone(phone_number):
+    """
+    Find the user registered with a phone number.
+    
+    Returns:
+        User document snapshot (SMS_USER_FIELDS only), or None
+    """
+    user_query = get_db().collection("users").where("phone_number", "==", phone_number)\
+                         .select(SMS_USER_FIELDS).limit(1).stream()
+    return next(user_query, None)
+
+_MONTHS = "January|February|March|April|May|June|July|August|September|October|November|December"
+
+# Date formats recognised in SMS messages, as one pattern:
+# YYYY-MM-DD, MM/DD/YYYY or DD/MM/YYYY, Month DD, YYYY and DD Month YYYY
+_SMS_DATE_RE = re.compile(
+    r"(?P<iso>\d{4}-\d{1,2}-\d{1,2})"
+    r"|(?P<slash>\d{1,2}/\d{1,2}/\d{4})"
+    rf"|(?P<month_day_year>(?:{_MONTHS})\s+\d{{1,2}},?\s+\d{{4}})"
+    rf"|(?P<day_month_year>\d{{1,2}}\s+(?:{_MONTHS})\s+\d{{4}})",
+    re.IGNORECASE
+)
+_ISO_DATE_RE = re.compile(r"(?P<iso>\d{4}-\d{1,2}-\d{1,2})")
+
 def extract_date_and_content(message_body):
     """
     Extract date and content from SMS message.
@@ -160,50 +223,34 @@ def extract_date_and_content(message_body):
     Returns:
         tuple: (date_string, content)
     """
-    # Common date patterns in SMS messages
-    date_patterns = [
-        # YYYY-MM-DD
-        r'(\d{4}-\d{1,2}-\d{1,2})',
-        # MM/DD/YYYY
-        r'(\d{1,2}/\d{1,2}/\d{4})',
-        # DD/MM/YYYY
-        r'(\d{1,2}/\d{1,2}/\d{4})',
-        # Month DD, YYYY
-        r'(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-        # DD Month YYYY
-        r'(\d{1,2}\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4})'
-    ]
+    # Fast path: messages that start with a valid YYYY-MM-DD date skip the regex
+    head = message_body[:10]
+    if (len(head) == 10 and head[4] == '-' and head[7] == '-'
+            and head[:4].isdecimal() and head[5:7].isdecimal() and head[8:].isdecimal()):
+        parsed = parse_memory_date(head)
+        if parsed is not None:
+            return parsed.isoformat(), message_body[10:].strip()
     
-    # Try to find a date in the message
-    date_match = None
-    for pattern in date_patterns:
-        match = re.search(pattern, message_body, re.IGNORECASE)
-        if match:
-            date_match = match
-            break
+    # One scan finds the first date in any format; only ISO dates are used
+    # as the memory date, so one later in the message still takes precedence
+    date_match = _SMS_DATE_RE.search(message_body)
+    if date_match and date_match.lastgroup != 'iso':
+        date_match = _ISO_DATE_RE.search(message_body, date_match.start() + 1) or date_match
     
     if date_match:
-        # Extract the date and remove it from the content
-        date_str = date_match.group(0)
-        content = message_body.replace(date_str, '').strip()
-        
-        # Try to convert to YYYY-MM-DD format
-        try:
-            # This is a simplified approach - in production, you'd want more robust date parsing
-            # For now, just use the matched date string if it's in YYYY-MM-DD format
-            if re.match(r'\d{4}-\d{1,2}-\d{1,2}', date_str):
-                date_of_memory = date_str
-            else:
-                # Default to today's date if conversion fails
-                date_of_memory = datetime.now().strftime('%Y-%m-%d')
-        except:
-            date_of_memory = datetime.now().strftime('%Y-%m-%d')
+        # Extract the date and cut it out of the content
+        start, end = date_match.span()
+        content = (message_body[:start] + message_body[end:]).strip()
+        
+        # Stored zero-padded, like app entries; impossible dates fall through
+        parsed = parse_memory_date(date_match.group(0)) if date_match.lastgroup == 'iso' else None
+        if parsed is not None:
+            return parsed.isoformat(), content
     else:
-        # No date found, use today's date
-        date_of_memory = datetime.now().strftime('%Y-%m-%d')
         content = message_body.strip()
     
-    return date_of_memory, content
+    # No valid date found, or one in a format that is not converted yet; use today's date
+    return date.today().isoformat(), content
 
 @sms_bp.route("/status", methods=["GET"])
 def sms_status():
@@ -234,18 +281,25 @@ def verify_phone():
         if not phone_number or not user_id:
             return jsonify({"success": False, "message": "Missing required fields: phone_number or user_id"}), 400
         
+        # The number is a Firestore document ID, so it must be canonical
+        phone_number = normalize_phone_number(phone_number)
+        if not phone_number:
+            return jsonify({"success": False, "message": "phone_number must be in E.164 format, e.g. +15551234567"}), 400
+        
         # Generate a 6-digit verification code
         verification_code = ''.join(random.choices(string.digits, k=6))
         
-        # Store the verification code (in production, use a more secure method with expiration)
-        verification_codes[phone_number] = {
+        # Store the verification code; it expires from the cache with the code
+        verification_codes.set(phone_number, {
             "code": verification_code,
             "user_id": user_id,
             "created_at": datetime.now()
-        }
+        })
         
-        # Store the code in Firestore so we can see it
-        code_ref = db.collection("verification_codes").add({
+        # Store the code in Firestore, keyed by phone number so confirm can
+        # fetch it directly; a new code replaces the previous one
+        code_ref = get_db().collection("verification_codes").document(phone_number)
+        code_ref.set({
             "phone_number": phone_number,
             "code": verification_code,
             "user_id": user_id,
@@ -267,7 +321,7 @@ def verify_phone():
                 logger.info(f"✅ Verification SMS sent to {phone_number}, SID: {message.sid}")
                 
                 # Update the Firestore record with the message SID
-                db.collection("verification_codes").document(code_ref[1].id).update({
+                code_ref.update({
                     "message_sid": message.sid,
                     "sent": True
                 })
@@ -317,33 +371,28 @@ def confirm_verification():
         if not phone_number or not code or not user_id:
             return jsonify({"success": False, "message": "Missing required fields"}), 400
         
+        phone_number = normalize_phone_number(phone_number)
+        if not phone_number:
+            return jsonify({"success": False, "message": "phone_number must be in E.164 format, e.g. +15551234567"}), 400
+        
+        code_ref = get_db().collection("verification_codes").document(phone_number)
+        
         # Check if the verification code is valid
         stored_data = verification_codes.get(phone_number)
+        code_doc = None
         
-        # For testing purposes, also check Firestore
+        # The code may have been sent by another worker; check Firestore
         if not stored_data:
-            # Try to find the code in Firestore
-            code_query = db.collection("verification_codes")\
-                .where("phone_number", "==", phone_number)\
-                .where("code", "==", code)\
-                .where("used", "==", False)\
-                .limit(1).stream()
+            code_doc = code_ref.get()
+            code_data = code_doc.to_dict() if code_doc.exists else None
             
-            code_docs = list(code_query)
-            if code_docs:
-                code_doc = code_docs[0]
-                code_data = code_doc.to_dict()
+            if code_data and not code_data.get("used"):
+                sent_at = code_data.get("timestamp")
                 stored_data = {
                     "code": code_data.get("code"),
                     "user_id": code_data.get("user_id"),
-                    "created_at": datetime.now()  # Approximate
+                    "created_at": datetime.fromtimestamp(sent_at.timestamp()) if sent_at else datetime.now()
                 }
-                
-                # Mark the code as used
-                db.collection("verification_codes").document(code_doc.id).update({
-                    "used": True,
-                    "verified_at": firestore.SERVER_TIMESTAMP
-                })
         
         if not stored_data:
             return jsonify({"success": False, "message": "Invalid verification code"}), 400
@@ -356,19 +405,29 @@ def confirm_verification():
         
         # Check if the code is expired (30 minutes)
         created_at = stored_data.get("created_at")
-        if (datetime.now() - created_at).total_seconds() > 1800:
+        if (datetime.now() - created_at).total_seconds() > VERIFICATION_CODE_TTL_SECONDS:
             return jsonify({"success": False, "message": "Verification code expired"}), 400
         
+        # Mark the code as used so no worker accepts it again; a code read
+        # from Firestore is only consumed if nobody else consumed it first
+        used = {"used": True, "verified_at": firestore.SERVER_TIMESTAMP}
+        if code_doc is not None:
+            try:
+                code_ref.update(used, option=get_db().write_option(last_update_time=code_doc.update_time))
+            except FailedPrecondition:
+                return jsonify({"success": False, "message": "Invalid verification code"}), 400
+        else:
+            code_ref.set(used, merge=True)
+        
         # Update the user's phone number in Firestore
-        db.collection("users").document(user_id).update({
+        get_db().collection("users").document(user_id).update({
             "phone_number": phone_number,
             "phone_verified": True,
             "phone_verified_at": firestore.SERVER_TIMESTAMP
         })
         
         # Remove the verification code
-        if phone_number in verification_codes:
-            del verification_codes[phone_number]
+        verification_codes.pop(phone_number)
         
         return jsonify({
             "success": True,
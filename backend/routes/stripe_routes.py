@@ -3,14 +3,12 @@ import logging
 import traceback
 from datetime import datetime
 from firebase_admin import firestore
+from utils.db import get_db
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Firestore
-db = firestore.client()
-
 # Create blueprint
 stripe_routes_bp = Blueprint("stripe_routes", __name__)
 
@@ -49,7 +47,7 @@ def setup_subscription():
             return jsonify({"error": "Invalid plan type. Must be 'monthly' or 'annual'"}), 400
             
         # Check if user exists
-        user_ref = db.collection("users").document(user_id)
+        user_ref = get_db().collection("users").document(user_id)
         user_doc = user_ref.get()
         
         if not user_doc.exists:
@@ -116,7 +114,7 @@ def cancel_subscription():
             return jsonify({"error": "Missing user_id"}), 400
             
         # Check if user exists
-        user_ref = db.collection("users").document(user_id)
+        user_ref = get_db().collection("users").document(user_id)
         user_doc = user_ref.get()
         
         if not user_doc.exists:
@@ -172,7 +170,7 @@ def subscription_status():
             return jsonify({"error": "Missing user_id parameter"}), 400
             
         # Check if user exists
-        user_ref = db.collection("users").document(user_id)
+        user_ref = get_db().collection("users").document(user_id)
         user_doc = user_ref.get()
         
         if not user_doc.exists:
@@ -236,7 +234,7 @@ def update_subscription():
             return jsonify({"error": "Invalid plan type. Must be 'monthly' or 'annual'"}), 400
             
         # Check if user exists
-        user_ref = db.collection("users").document(user_id)
+        user_ref = get_db().collection("users").document(user_id)
         user_doc = user_ref.get()
         
         if not user_doc.exists:
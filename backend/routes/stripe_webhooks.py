@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify
 import stripe
 import os
 import logging
-from utils import firebase
+from utils.db import get_db
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -67,8 +67,7 @@ def handle_trial_ending(data):
         subscription_id = data.get('id')
         
         # Get user by Stripe customer ID
-        db = firebase.db
-        users_ref = db.collection('users')
+        users_ref = get_db().collection('users')
         query = users_ref.where('stripe_customer_id', '==', customer_id).limit(1)
         user_docs = query.get()
         
@@ -112,8 +111,7 @@ def handle_payment_succeeded(data):
             return jsonify({"status": "ignored", "message": "Non-subscription invoice"}), 200
         
         # Get user by Stripe customer ID
-        db = firebase.db
-        users_ref = db.collection('users')
+        users_ref = get_db().collection('users')
         query = users_ref.where('stripe_customer_id', '==', customer_id).limit(1)
         user_docs = query.get()
         
@@ -155,8 +153,7 @@ def handle_payment_failed(data):
             return jsonify({"status": "ignored", "message": "Non-subscription invoice"}), 200
         
         # Get user by Stripe customer ID
-        db = firebase.db
-        users_ref = db.collection('users')
+        users_ref = get_db().collection('users')
         query = users_ref.where('stripe_customer_id', '==', customer_id).limit(1)
         user_docs = query.get()
         
@@ -0,0 +1,52 @@
+import pytest
+import base64
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# Mock the Firebase and OpenAI dependencies
+class MockFirestore:
+    def client(self):
+        return self
+
+class MockOpenAI:
+    def __init__(self, api_key=None):
+        pass
+
+# Create mock modules
+sys.modules['firebase_admin'] = type('MockFirebaseAdmin', (), {
+    'firestore': MockFirestore(),
+    'storage': object(),
+    'initialize_app': lambda *args, **kwargs: None
+})
+
+sys.modules['openai'] = type('MockOpenAI', (), {
+    'OpenAI': MockOpenAI
+})
+
+from backend.routes.entry import _encode_cursor, _decode_cursor
+
+def test_cursor_round_trip():
+    """Test a cursor decodes back to the date and document ID it encodes."""
+    cursor = _encode_cursor("2024-03-05", "abc123")
+    assert _decode_cursor(cursor) == ("2024-03-05", "abc123")
+
+def test_cursor_is_url_safe():
+    """Test cursors only use URL-safe characters."""
+    cursor = _encode_cursor("2024-03-05", "id/with+chars?")
+    assert all(c.isalnum() or c in "-_=" for c in cursor)
+    assert _decode_cursor(cursor) == ("2024-03-05", "id/with+chars?")
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "caf\u00e9",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+    base64.urlsafe_b64encode(b"2024-03-05").decode("ascii"),
+    base64.urlsafe_b64encode(b"2024-03-05|").decode("ascii"),
+])
+def test_decode_cursor_rejects_malformed(cursor):
+    """Test malformed cursors raise ValueError."""
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor)
@@ -0,0 +1,44 @@
+import sys
+import os
+from datetime import date
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.utils.helpers import parse_memory_date, normalize_phone_number
+
+def test_parse_memory_date_zero_padded():
+    """Test a canonical YYYY-MM-DD date parses."""
+    assert parse_memory_date("2024-03-05") == date(2024, 3, 5)
+
+def test_parse_memory_date_single_digit_parts():
+    """Test single-digit months and days parse and normalize to ISO."""
+    assert parse_memory_date("2024-3-5") == date(2024, 3, 5)
+    assert parse_memory_date("2024-3-05").isoformat() == "2024-03-05"
+    assert parse_memory_date("2024-12-5").isoformat() == "2024-12-05"
+
+def test_parse_memory_date_invalid_dates():
+    """Test impossible dates and other formats are rejected."""
+    assert parse_memory_date("2024-02-30") is None
+    assert parse_memory_date("2024-13-01") is None
+    assert parse_memory_date("2024-1-32") is None
+    assert parse_memory_date("03/05/2024") is None
+    assert parse_memory_date("2024-03-05T10:00") is None
+    assert parse_memory_date("2024-03-05\n") is None
+    assert parse_memory_date("") is None
+
+def test_parse_memory_date_non_string():
+    """Test non-string values are rejected."""
+    assert parse_memory_date(None) is None
+    assert parse_memory_date(20240305) is None
+
+def test_normalize_phone_number_strips_formatting():
+    """Test formatted E.164 numbers are normalized."""
+    assert normalize_phone_number("+15551234567") == "+15551234567"
+    assert normalize_phone_number("+1 (555) 123-4567") == "+15551234567"
+    assert normalize_phone_number("+44 20.7946.0018") == "+442079460018"
+
+def test_normalize_phone_number_invalid():
+    """Test non-E.164 values are rejected."""
+    for value in ["5551234567", "+0555123456", "+1555", "+1234567890123456", "+1555/123/4567", "../users", "", None, 15551234567]:
+        assert normalize_phone_number(value) is None
@@ -0,0 +1,116 @@
+import sys
+import os
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+# Mock the OpenAI dependency
+class MockOpenAI:
+    def __init__(self, api_key=None):
+        pass
+
+sys.modules['openai'] = type('MockOpenAI', (), {
+    'OpenAI': MockOpenAI
+})
+
+from backend.utils import openai_client
+from backend.utils.openai_client import generate_fallback_tags, get_embedding_tags, TAG_PROTOTYPES
+
+def test_fallback_tags_in_category_order():
+    """Test matched tags come back in FALLBACK_TAG_KEYWORDS order."""
+    assert generate_fallback_tags("Mom gave the baby a bottle") == ["baby", "food", "family"]
+
+def test_fallback_tags_overlapping_keywords():
+    """Test a word matching keywords of two tags gives both tags."""
+    assert generate_fallback_tags("We walked home together") == ["milestone", "outdoors"]
+
+def test_fallback_tags_case_insensitive():
+    """Test keywords match regardless of case."""
+    assert generate_fallback_tags("PARK day") == ["outdoors"]
+
+def test_fallback_tags_keyword_must_start_word():
+    """Test a keyword inside another word does not match."""
+    assert generate_fallback_tags("What a great day") == ["memory"]
+
+def test_fallback_tags_default():
+    """Test content without keywords is tagged 'memory'."""
+    assert generate_fallback_tags("") == ["memory"]
+    assert generate_fallback_tags("Nothing to see") == ["memory"]
+
+class _Embedding:
+    def __init__(self, embedding):
+        self.embedding = embedding
+
+class _EmbeddingsResponse:
+    def __init__(self, vectors):
+        self.data = [_Embedding(v) for v in vectors]
+
+class StubEmbeddings:
+    """Embeds each tag prototype as its own axis and content as a fixed vector."""
+    def __init__(self, content_vector=None, error=None):
+        self.content_vector = content_vector
+        self.error = error
+        self.calls = []
+
+    def create(self, model, input):
+        self.calls.append(input)
+        if isinstance(input, list):
+            return _EmbeddingsResponse([
+                [1.0 if i == j else 0.0 for j in range(len(input))]
+                for i in range(len(input))
+            ])
+        if self.error:
+            raise self.error
+        return _EmbeddingsResponse([self.content_vector])
+
+def _content_vector(scores):
+    """Content vector with the given cosine similarity to each named tag."""
+    vector = [scores.get(tag, 0.0) for tag in TAG_PROTOTYPES]
+    # Pad with an extra axis so the vector is unit length as given
+    rest = 1.0 - sum(x * x for x in vector)
+    return vector + [rest ** 0.5]
+
+@pytest.fixture
+def stub_embeddings(monkeypatch):
+    def install(**kwargs):
+        embeddings = StubEmbeddings(**kwargs)
+        monkeypatch.setattr(openai_client, "client", type("StubClient", (), {"embeddings": embeddings})())
+        monkeypatch.setattr(openai_client, "_tag_vectors", None)
+        return embeddings
+    return install
+
+def test_tag_prototypes_have_no_shared_boilerplate():
+    """Test each prototype is just its tag and keywords."""
+    assert TAG_PROTOTYPES["sleep"] == "sleep: sleep, nap, bedtime"
+
+def test_embedding_tags_within_margin_of_best(stub_embeddings, monkeypatch):
+    """Test only tags scoring close to the best tag are kept, best first."""
+    monkeypatch.setattr(openai_client, "EMBEDDING_TAG_MARGIN", 0.05)
+    monkeypatch.setattr(openai_client, "EMBEDDING_TAG_MIN_SCORE", 0.2)
+    stub_embeddings(content_vector=_content_vector({"sleep": 0.6, "baby": 0.57, "food": 0.4}))
+    assert get_embedding_tags("The baby took a long nap") == ["sleep", "baby"]
+
+def test_embedding_tags_limited(stub_embeddings, monkeypatch):
+    """Test at most EMBEDDING_TAG_LIMIT tags are returned."""
+    monkeypatch.setattr(openai_client, "EMBEDDING_TAG_LIMIT", 2)
+    stub_embeddings(content_vector=_content_vector({"sleep": 0.4, "baby": 0.4, "food": 0.4, "play": 0.4}))
+    assert len(get_embedding_tags("A very ordinary day")) == 2
+
+def test_embedding_tags_below_floor(stub_embeddings, monkeypatch):
+    """Test content matching no tag well enough gets no tags."""
+    monkeypatch.setattr(openai_client, "EMBEDDING_TAG_MIN_SCORE", 0.2)
+    stub_embeddings(content_vector=_content_vector({"sleep": 0.15, "baby": 0.14}))
+    assert get_embedding_tags("Quarterly tax paperwork") == []
+
+def test_embedding_tags_embeds_prototypes_once(stub_embeddings):
+    """Test the prototypes are embedded in one batch and reused."""
+    embeddings = stub_embeddings(content_vector=_content_vector({"play": 0.5}))
+    get_embedding_tags("Playing with blocks today")
+    get_embedding_tags("More playing with blocks")
+    assert sum(isinstance(call, list) for call in embeddings.calls) == 1
+
+def test_embedding_tags_failure(stub_embeddings):
+    """Test a failed embeddings call returns an empty list."""
+    stub_embeddings(error=RuntimeError("API down"))
+    assert get_embedding_tags("The baby took a long nap") == []
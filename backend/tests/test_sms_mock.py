@@ -26,8 +26,9 @@ sys.modules['openai'] = type('MockOpenAI', (), {
 })
 
 # Now import the Flask app and routes
+from datetime import date
 from flask import Flask
-from backend.routes.sms import sms_bp
+from backend.routes.sms import sms_bp, extract_date_and_content
 
 # Create a test Flask app
 @pytest.fixture
@@ -48,4 +49,39 @@ def test_sms_status_endpoint(client):
     assert data["status"] == "active"
     assert "message" in data
 
-# More tests would be added here, but we're focusing on basic validation
+def test_extract_leading_iso_date():
+    """Test a message that starts with YYYY-MM-DD uses that date."""
+    assert extract_date_and_content("2024-03-05 first steps") == ("2024-03-05", "first steps")
+
+def test_extract_bare_iso_date():
+    """Test a message that is only a date leaves empty content."""
+    assert extract_date_and_content("  2024-03-05  ") == ("2024-03-05", "")
+
+def test_extract_unpadded_iso_date_is_zero_padded():
+    """Test single-digit months and days are stored zero-padded."""
+    assert extract_date_and_content("2024-1-5 hi") == ("2024-01-05", "hi")
+    assert extract_date_and_content("Walked 2024-3-05 today") == ("2024-03-05", "Walked  today")
+
+def test_extract_impossible_date_uses_today():
+    """Test an impossible ISO-shaped date is cut from the content but today's date is used."""
+    assert extract_date_and_content("2024-13-45 hi") == (date.today().isoformat(), "hi")
+    assert extract_date_and_content("hi 2024-02-30 there") == (date.today().isoformat(), "hi  there")
+
+def test_extract_iso_date_after_other_format():
+    """Test an ISO date later in the message wins over an earlier non-ISO date."""
+    assert extract_date_and_content("12/25/2023 and 2024-01-01") == ("2024-01-01", "12/25/2023 and")
+    assert extract_date_and_content("3/4/2024-05-06 x") == ("2024-05-06", "3/4/ x")
+
+def test_extract_repeated_date_removes_only_match():
+    """Test only the matched occurrence of a repeated date is cut from the content."""
+    assert extract_date_and_content("x 2024-03-05 y 2024-03-05 z") == ("2024-03-05", "x  y 2024-03-05 z")
+    assert extract_date_and_content("2024-03-05 again 2024-03-05") == ("2024-03-05", "again 2024-03-05")
+
+def test_extract_non_iso_date_uses_today():
+    """Test a non-ISO date is removed from the content but today's date is used."""
+    assert extract_date_and_content("March 5, 2024 park day") == (date.today().isoformat(), "park day")
+
+def test_extract_no_date_uses_today():
+    """Test a message without a date keeps its content and uses today's date."""
+    assert extract_date_and_content(" Today she walked ") == (date.today().isoformat(), "Today she walked")
+    assert extract_date_and_content("") == (date.today().isoformat(), "")
@@ -0,0 +1,56 @@
+import sys
+import os
+
+# Add the backend directory to the Python path (tag_cache imports utils.*)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock the OpenAI and Redis dependencies
+class MockOpenAI:
+    def __init__(self, api_key=None):
+        pass
+
+sys.modules['openai'] = type('MockOpenAI', (), {
+    'OpenAI': MockOpenAI
+})
+sys.modules['redis'] = type('MockRedis', (), {})
+
+import pytest
+from utils import openai_client, tag_cache
+
+class FailingEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, input):
+        self.calls += 1
+        raise RuntimeError("API down")
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.setattr(tag_cache, "_redis_client", None)
+
+def test_falls_back_when_embeddings_fail(monkeypatch):
+    """Test keyword tags are used when the embeddings call fails."""
+    embeddings = FailingEmbeddings()
+    monkeypatch.setattr(openai_client, "client", type("StubClient", (), {"embeddings": embeddings})())
+    monkeypatch.setattr(openai_client, "_tag_vectors", None)
+    assert tag_cache.get_or_compute_tags("Mom gave the baby a bottle") == ["baby", "food", "family"]
+    assert embeddings.calls == 1
+
+def test_falls_back_when_no_tag_matches(monkeypatch):
+    """Test keyword tags are used when no embedding tag clears the cutoff."""
+    monkeypatch.setattr(tag_cache, "get_embedding_tags", lambda content: [])
+    assert tag_cache.get_or_compute_tags("We had a quiet afternoon") == ["memory"]
+
+def test_uses_embedding_tags(monkeypatch):
+    """Test embedding tags are returned when there are any."""
+    monkeypatch.setattr(tag_cache, "get_embedding_tags", lambda content: ["sleep"])
+    assert tag_cache.get_or_compute_tags("The baby took a long nap") == ["sleep"]
+
+def test_short_content_skips_embeddings(monkeypatch):
+    """Test content too short for an OpenAI request goes straight to keyword tags."""
+    def fail(content):
+        raise AssertionError("embeddings should not be called")
+    monkeypatch.setattr(tag_cache, "get_embedding_tags", fail)
+    assert tag_cache.get_or_compute_tags("nap") == ["sleep"]
@@ -0,0 +1,49 @@
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.utils.ttl_cache import TTLCache
+
+def test_get_returns_value_until_expiry():
+    """Test a set value is returned, and a missing key gives the default."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+def test_expired_entries_are_not_returned():
+    """Test an entry past its ttl is treated as missing."""
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a", "expired") == "expired"
+
+def test_full_cache_evicts_oldest_entry():
+    """Test the oldest entry is evicted when maxsize is reached."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+
+def test_set_existing_key_refreshes_position():
+    """Test re-setting a key replaces its value and makes it the newest entry."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+    cache.set("c", 3)
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+def test_pop_removes_entry():
+    """Test pop returns the value once and then the default."""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+    assert cache.get("a") is None
@@ -1,6 +1,6 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 import logging
-from utils import firebase
+from utils.db import get_db
 from firebase_admin import firestore
 import os
 
@@ -22,7 +22,7 @@ def get_user_role(user_id):
         Role string ('parent', 'co-parent', 'caregiver', 'admin') or None if not found
     """
     try:
-        db = firebase.db
+        db = get_db()
         user_ref = db.collection('users').document(user_id)
         user_doc = user_ref.get()
         
@@ -65,6 +65,8 @@ def require_role(required_roles):
                 logger.warning(f"Unauthorized access attempt: {user_id} with role {user_role}")
                 return jsonify({"error": "Insufficient permissions"}), 403
                 
+            # Expose the role to the view so it need not read the user again
+            g.user_role = user_role
             return f(*args, **kwargs)
         wrapped.__name__ = f.__name__
         return wrapped
@@ -106,7 +108,7 @@ def require_entry_permission(action):
                 
             # Get entry details
             try:
-                db = firebase.db
+                db = get_db()
                 entry_ref = db.collection('entries').document(entry_id)
                 entry_doc = entry_ref.get()
                 
@@ -0,0 +1,29 @@
+import logging
+import threading
+from firebase_admin import firestore
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_db = None
+_db_lock = threading.Lock()
+
+def get_db():
+    """
+    Return the process-wide Firestore client, creating it on first use.
+
+    Creating the client lazily keeps module imports free of SDK setup, so a
+    worker only opens its gRPC channel once it handles a request. Every caller
+    shares the same client and therefore the same long-lived channel, which
+    the SDK configures with HTTP/2 keepalive pings.
+
+    Returns:
+        firestore.Client instance
+    """
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = firestore.client()
+                logger.info("🔥 Firestore client initialized")
+    return _db
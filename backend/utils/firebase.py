@@ -17,5 +17,7 @@ if not firebase_admin._apps:
     })
 
     firebase_admin.initialize_app(cred, {
-        "storageBucket": os.getenv("FIREBASE_STORAGE_BUCKET")
+        "storageBucket": os.getenv("FIREBASE_STORAGE_BUCKET"),
+        "projectId": os.getenv("FIREBASE_PROJECT_ID"),
+        "httpTimeout": 30
     })
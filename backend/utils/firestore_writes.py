@@ -0,0 +1,24 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Writes the caller does not wait for (e.g. last_entry_ts bookkeeping)
+_queued_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="firestore-queued")
+
+def _log_write_error(future):
+    if future.exception() is not None:
+        logger.error(f"❌ Queued Firestore write failed: {str(future.exception())}")
+
+def queue_update(reference, data):
+    """
+    Update a document in the background without waiting for the commit;
+    a failure is logged rather than raised.
+
+    Returns:
+        Future resolved with the WriteResult, or with the write's error
+    """
+    future = _queued_pool.submit(reference.update, data)
+    future.add_done_callback(_log_write_error)
+    return future
@@ -1 +1,49 @@
-# Placeholder for utility functions
\ No newline at end of file
+import re
+from datetime import date
+
+# YYYY-MM-DD (single-digit month/day accepted, as strptime did)
+_DATE_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+
+def parse_memory_date(value):
+    """
+    Parse a YYYY-MM-DD memory date.
+    
+    Memory dates are stored as zero-padded ISO strings so that Firestore's
+    string ordering matches date order; pass the result's isoformat() to
+    Firestore rather than the raw input.
+    
+    Returns:
+        datetime.date, or None if value is not a valid date
+    """
+    if not isinstance(value, str):
+        return None
+    # Fast path: canonical zero-padded dates go straight to the C parser
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return None
+    m = _DATE_RE.fullmatch(value)
+    try:
+        return date(int(m[1]), int(m[2]), int(m[3])) if m else None
+    except ValueError:
+        return None
+
+# E.164: "+", country code, at most 15 digits in all
+_E164_RE = re.compile(r"^\+[1-9]\d{7,14}$")
+
+# Formatting people type between digits
+_PHONE_FORMATTING_RE = re.compile(r"[\s().-]")
+
+def normalize_phone_number(value):
+    """
+    Normalize a phone number to E.164, dropping spaces, dots, dashes and
+    parentheses.
+    
+    Returns:
+        The E.164 string, or None if value is not an E.164 number
+    """
+    if not isinstance(value, str):
+        return None
+    number = _PHONE_FORMATTING_RE.sub("", value)
+    return number if _E164_RE.fullmatch(number) else None
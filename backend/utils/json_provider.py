@@ -0,0 +1,46 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+class OrJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Like DefaultJSONProvider, keys are sorted and dates and other non-native
+    types go through the same default() hook (so datetimes are still HTTP
+    dates). Unlike it, non-ASCII text is written as raw UTF-8 rather than
+    \\u escapes. Anything orjson cannot encode, such as integers wider than
+    64 bits, falls back to the stdlib encoder, as do dumps()/loads() calls
+    with json module arguments orjson has no equivalent for.
+    """
+
+    def _options(self, indent):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumps_bytes(self, obj, indent=False):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except orjson.JSONEncodeError:
+            fallback_args = {"indent": 2} if indent else {"separators": (",", ":")}
+            return super().dumps(obj, **fallback_args).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        # orjson only indents by two spaces and takes no other json.dumps
+        # arguments (default, sort_keys, ensure_ascii, ...)
+        if kwargs.keys() - {"indent"} or kwargs.get("indent") not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj, kwargs.get("indent")).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
@@ -1,5 +1,10 @@
+import io
 import os
+import mimetypes
+import requests
+from requests.adapters import HTTPAdapter
 from firebase_admin import storage
+from google.cloud.storage import transfer_manager
 from werkzeug.utils import secure_filename
 import uuid
 import logging
@@ -8,6 +13,54 @@ from datetime import datetime, timedelta
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Files at or above this size are uploaded as parallel chunks
+CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_WORKERS = 8
+
+# Remote media (MMS attachments) is read in chunks and capped at this size
+REMOTE_MEDIA_CHUNK_SIZE = 64 * 1024
+MAX_REMOTE_MEDIA_BYTES = 10 * 1024 * 1024
+
+# Shared session so remote media downloads reuse pooled TCP/TLS connections
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20))
+
+def _new_media_blob(filename, folder_path):
+    """Create a blob with a collision-free name under folder_path."""
+    bucket = storage.bucket(os.getenv("FIREBASE_STORAGE_BUCKET"))
+    
+    # Create a unique filename to prevent collisions
+    unique_filename = f"{uuid.uuid4().hex}_{secure_filename(filename)}"
+    
+    # Create full path with folder structure
+    return bucket.blob(f"{folder_path}/{unique_filename}")
+
+def _finalize_media_blob(blob, content_type):
+    """
+    Set metadata and access control on an uploaded blob.
+    
+    Returns:
+        Signed URL for accessing the uploaded file
+    """
+    # Set appropriate metadata
+    metadata = {
+        'contentType': content_type,
+        'uploadTime': datetime.now().isoformat()
+    }
+    blob.metadata = metadata
+    blob.patch()
+    
+    # Set appropriate access control
+    blob.make_private()
+    
+    # Generate signed URL with longer expiration (7 days)
+    expiration_time = datetime.now() + timedelta(days=7)
+    return blob.generate_signed_url(
+        expiration=int(expiration_time.timestamp()),
+        method='GET'
+    )
+
 def upload_media_to_firebase(file_stream, filename, content_type, folder_path="uploads"):
     """
     Upload media file to Firebase Storage with organized folder structure.
@@ -22,43 +75,97 @@ def upload_media_to_firebase(file_stream, filename, content_type, folder_path="u
         Signed URL for accessing the uploaded file
     """
     try:
-        bucket = storage.bucket(os.getenv("FIREBASE_STORAGE_BUCKET"))
-        
-        # Create a unique filename to prevent collisions
-        unique_filename = f"{uuid.uuid4().hex}_{secure_filename(filename)}"
-        
-        # Create full path with folder structure
-        full_path = f"{folder_path}/{unique_filename}"
-        
         # Create blob and upload
-        blob = bucket.blob(full_path)
+        blob = _new_media_blob(filename, folder_path)
         blob.upload_from_file(file_stream, content_type=content_type)
         
-        # Set appropriate metadata
-        metadata = {
-            'contentType': content_type,
-            'uploadTime': datetime.now().isoformat()
-        }
-        blob.metadata = metadata
-        blob.patch()
+        signed_url = _finalize_media_blob(blob, content_type)
         
-        # Set appropriate access control
-        blob.make_private()
+        logger.info(f"Media uploaded successfully to {blob.name}")
+        return signed_url
         
-        # Generate signed URL with longer expiration (7 days)
-        expiration_time = datetime.now() + timedelta(days=7)
-        signed_url = blob.generate_signed_url(
-            expiration=int(expiration_time.timestamp()),
-            method='GET'
-        )
+    except Exception as e:
+        logger.error(f"Error uploading media to Firebase: {str(e)}")
+        raise
+
+def upload_media_file_to_firebase(file_path, filename, content_type, folder_path="uploads"):
+    """
+    Upload a media file on local disk to Firebase Storage.
+    
+    Files below CHUNKED_UPLOAD_THRESHOLD go up in a single request. Larger
+    files are split into UPLOAD_CHUNK_SIZE parts that are sent concurrently
+    as a multipart upload and assembled server-side, so a large video is
+    not limited to one connection's throughput.
+    
+    Args:
+        file_path: Path of the file to upload
+        filename: Original filename
+        content_type: MIME type of the file
+        folder_path: Path within storage bucket (default: "uploads")
         
-        logger.info(f"Media uploaded successfully to {full_path}")
+    Returns:
+        Signed URL for accessing the uploaded file
+    """
+    try:
+        blob = _new_media_blob(filename, folder_path)
+        size = os.path.getsize(file_path)
+        
+        if size < CHUNKED_UPLOAD_THRESHOLD:
+            blob.upload_from_filename(file_path, content_type=content_type)
+        else:
+            logger.info(f"📦 Uploading {size} bytes to {blob.name} in parallel chunks")
+            transfer_manager.upload_chunks_concurrently(
+                file_path,
+                blob,
+                content_type=content_type,
+                chunk_size=UPLOAD_CHUNK_SIZE,
+                worker_type=transfer_manager.THREAD,
+                max_workers=UPLOAD_WORKERS
+            )
+        
+        signed_url = _finalize_media_blob(blob, content_type)
+        
+        logger.info(f"Media uploaded successfully to {blob.name}")
         return signed_url
         
     except Exception as e:
         logger.error(f"Error uploading media to Firebase: {str(e)}")
         raise
 
+def copy_remote_media_to_firebase(media_url, folder_path="uploads", auth=None):
+    """
+    Download a remote media file (e.g. a Twilio MMS attachment) and store it
+    in Firebase Storage.
+    
+    Args:
+        media_url: URL of the media to download
+        folder_path: Path within storage bucket (default: "uploads")
+        auth: Optional (username, password) tuple for the download
+        
+    Returns:
+        Signed URL for accessing the uploaded file
+        
+    Raises:
+        ValueError: If the file exceeds MAX_REMOTE_MEDIA_BYTES
+    """
+    with _http.get(media_url, auth=auth, stream=True, timeout=10) as response:
+        response.raise_for_status()
+        if int(response.headers.get("Content-Length") or 0) > MAX_REMOTE_MEDIA_BYTES:
+            raise ValueError(f"Media larger than {MAX_REMOTE_MEDIA_BYTES} bytes")
+        
+        data = bytearray()
+        for chunk in response.iter_content(chunk_size=REMOTE_MEDIA_CHUNK_SIZE):
+            data.extend(chunk)
+            if len(data) > MAX_REMOTE_MEDIA_BYTES:
+                raise ValueError(f"Media larger than {MAX_REMOTE_MEDIA_BYTES} bytes")
+        
+        content_type = response.headers.get("Content-Type", "application/octet-stream").split(";")[0]
+    
+    extension = mimetypes.guess_extension(content_type) or ""
+    filename = f"{media_url.rstrip('/').rsplit('/', 1)[-1]}{extension}"
+    
+    return upload_media_to_firebase(io.BytesIO(data), filename, content_type, folder_path)
+
 def delete_media_from_firebase(media_url):
     """
     Delete media file from Firebase Storage based on URL.
@@ -0,0 +1,77 @@
+import os
+import logging
+import tempfile
+from flask import request
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.parser import ParseFailedException
+from streaming_form_data.targets import FileTarget, ListTarget
+from werkzeug.datastructures import MultiDict
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 65536
+
+def stream_multipart_form(field_names, file_field):
+    """
+    Parse the current multipart request body incrementally.
+
+    Form fields are collected in memory and the file part is streamed
+    straight to a temporary file, bypassing Werkzeug's buffered form parser.
+
+    Args:
+        field_names: Names of the text fields to collect
+        file_field: Name of the file field
+
+    Returns:
+        Tuple of (MultiDict of form values, media dict or None). The media
+        dict has 'path', 'filename' and 'content_type'; the caller owns the
+        temporary file at 'path'.
+
+    Raises:
+        ValueError: If the body is not valid multipart or a text field is
+            not UTF-8
+    """
+    # The constructor rejects a missing Content-Type or boundary
+    try:
+        parser = StreamingFormDataParser(headers={"Content-Type": request.content_type})
+    except ParseFailedException as e:
+        raise ValueError(str(e)) from e
+
+    targets = {}
+    for name in field_names:
+        targets[name] = ListTarget(str)
+        parser.register(name, targets[name])
+
+    fd, tmp_path = tempfile.mkstemp(prefix="upload_")
+    os.close(fd)
+    file_target = FileTarget(tmp_path)
+    parser.register(file_field, file_target)
+
+    try:
+        while True:
+            chunk = request.stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.data_received(chunk)
+    except ParseFailedException as e:
+        os.remove(tmp_path)
+        raise ValueError(str(e)) from e
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+    form = MultiDict([(name, value) for name, target in targets.items() for value in target.value])
+
+    # An empty file input is sent with a blank filename; treat it as no media
+    if not file_target.multipart_filename:
+        os.remove(tmp_path)
+        return form, None
+
+    media = {
+        "path": tmp_path,
+        "filename": file_target.multipart_filename,
+        "content_type": file_target.multipart_content_type
+    }
+    logger.info(f"📂 Streamed upload {media['filename']} to {tmp_path}")
+    return form, media
@@ -1,9 +1,10 @@
 from openai import OpenAI
 import os
+import re
+import math
+import threading
 import tempfile
 import logging
-import base64
-import requests
 from io import BytesIO
 
 # Configure logging
@@ -12,150 +13,129 @@ logger = logging.getLogger(__name__)
 # Initialize OpenAI client
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def get_ai_tags(content, media_url=None, media_type=None):
+# Keyword groups for generate_fallback_tags, in output order
+FALLBACK_TAG_KEYWORDS = {
+    "baby": ("baby", "infant", "newborn"),
+    "sleep": ("sleep", "nap", "bedtime"),
+    "food": ("eat", "food", "meal", "bottle", "feeding"),
+    "milestone": ("first", "milestone", "walked", "crawled", "talked"),
+    "play": ("play", "toy", "game"),
+    "outdoors": ("park", "outside", "beach", "walk"),
+    "health": ("doctor", "sick", "checkup", "vaccine"),
+    "happy": ("smile", "laugh", "giggle", "happy"),
+    "family": ("mom", "dad", "grandma", "grandpa", "family"),
+}
+
+# One precompiled pattern per tag, each searched separately so keywords
+# that overlap ("walked" and "walk") still tag both groups; a keyword must
+# start a word
+_FALLBACK_TAG_RES = {
+    tag: re.compile(r"\b(?:" + "|".join(words) + ")", re.IGNORECASE)
+    for tag, words in FALLBACK_TAG_KEYWORDS.items()
+}
+
+# Text below either threshold gets keyword fallback tags instead of an OpenAI call
+MIN_AI_TAG_CHARS = 10
+MIN_AI_TAG_WORDS = 3
+
+def should_ai_tag(content):
     """
-    Generate tags for a journal entry using OpenAI.
+    Check whether text content is substantial enough to be worth an OpenAI tagging request.
     
     Args:
-        content: The text content to generate tags for
-        media_url: Optional URL to media file (image, video)
-        media_type: Media MIME type
+        content: The text content to check
         
     Returns:
-        List of generated tags
+        Boolean
     """
-    try:
-        logger.info("🔍 Generating AI tags for content and media")
-        
-        # Skip if content is too short and no media
-        if len(content.strip()) < 10 and not media_url:
-            logger.info("Content too short for tag generation and no media provided")
-            return []
-        
-        # Enhanced system prompt to focus on object detection in images
-        messages = [
-            {
-                "role": "system",
-                "content": "You are a helpful assistant who extracts 3-5 short descriptive tags from a journal entry. When analyzing images, identify specific objects, people, animals, locations, and activities visible in the image. For example, if there's a dog in the photo, include 'dog' as a tag. Focus on key themes, emotions, activities, or milestones. Return only a comma-separated list of tags, no explanation."
-            }
-        ]
+    if not content:
+        return False
+    stripped = content.strip()
+    return len(stripped) >= MIN_AI_TAG_CHARS and len(stripped.split()) >= MIN_AI_TAG_WORDS
+
+def generate_fallback_tags(content):
+    """
+    Generate simple keyword-based tags when AI tagging is unavailable.
+    
+    Args:
+        content: The text content to generate tags for
         
-        # If we have an image, analyze it using vision model
-        if media_url and media_type and media_type.startswith('image/'):
-            try:
-                # For local files that start with /
-                if media_url.startswith('/'):
-                    # Read the image file and encode as base64
-                    with open(media_url, 'rb') as image_file:
-                        image_data = base64.b64encode(image_file.read()).decode('utf-8')
-                        
-                    # Create a data URL
-                    data_url = f"data:{media_type};base64,{image_data}"
-                    
-                    # Use GPT-4 Vision to analyze the image with enhanced prompt
-                    messages.append({
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": f"Please provide tags for this memory based on both the text and image. Identify specific objects, people, animals, locations, and activities visible in the image:\n\n{content}"},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": data_url}
-                            }
-                        ]
-                    })
-                    
-                    # Use GPT-4 Vision model with increased max_tokens for better analysis
-                    response = client.chat.completions.create(
-                        model="gpt-4-vision-preview",
-                        messages=messages,
-                        max_tokens=100,
-                        temperature=0.5
-                    )
-                else:
-                    # For remote URLs, download the image first to ensure it's accessible
-                    try:
-                        # Download the image from the URL
-                        image_response = requests.get(media_url, timeout=10)
-                        if image_response.status_code == 200:
-                            # Convert to base64 to ensure reliable processing
-                            image_data = base64.b64encode(image_response.content).decode('utf-8')
-                            data_url = f"data:{media_type};base64,{image_data}"
-                            
-                            # Use the data URL instead of the original URL
-                            image_url_to_use = data_url
-                        else:
-                            # If download fails, use the original URL
-                            logger.warning(f"Failed to download image from URL: {media_url}, status code: {image_response.status_code}")
-                            image_url_to_use = media_url
-                    except Exception as download_error:
-                        logger.warning(f"Error downloading image from URL: {str(download_error)}")
-                        image_url_to_use = media_url
-                    
-                    # Use GPT-4 Vision to analyze the image with enhanced prompt
-                    messages.append({
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": f"Please provide tags for this memory based on both the text and image. Identify specific objects, people, animals, locations, and activities visible in the image:\n\n{content}"},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": image_url_to_use}
-                            }
-                        ]
-                    })
-                    
-                    # Use GPT-4 Vision model with increased max_tokens for better analysis
-                    response = client.chat.completions.create(
-                        model="gpt-4-vision-preview",
-                        messages=messages,
-                        max_tokens=100,
-                        temperature=0.5
-                    )
-                
-                logger.info("Successfully analyzed image for tag generation")
-                
-            except Exception as e:
-                logger.error(f"❌ Image analysis failed: {str(e)}")
-                # Fall back to text-only analysis
-                messages.append({
-                    "role": "user",
-                    "content": f"Please provide tags for this memory:\n\n{content}"
-                })
-                
-                response = client.chat.completions.create(
-                    model="gpt-4",
-                    messages=messages,
-                    max_tokens=50,
-                    temperature=0.5
-                )
-        else:
-            # Text-only analysis
-            messages.append({
-                "role": "user",
-                "content": f"Please provide tags for this memory:\n\n{content}"
-            })
-            
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=messages,
-                max_tokens=50,
-                temperature=0.5
-            )
-            
-        raw = response.choices[0].message.content
-        logger.info(f"🔁 Raw response from OpenAI: {raw}")
+    Returns:
+        List of tags (["memory"] if no keywords match)
+    """
+    return [tag for tag, pattern in _FALLBACK_TAG_RES.items() if pattern.search(content)] or ["memory"]
+
+# Embedding-based tagging against the fallback vocabulary
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Any journal text sits at a similar distance from every prototype, so a
+# tag is kept by how close it scores to the best tag rather than by a flat
+# cutoff; the floor only drops content that matches nothing. Both are
+# overridable so they can be tuned against real entries
+EMBEDDING_TAG_MIN_SCORE = float(os.getenv("EMBEDDING_TAG_MIN_SCORE", "0.2"))
+EMBEDDING_TAG_MARGIN = float(os.getenv("EMBEDDING_TAG_MARGIN", "0.04"))
+EMBEDDING_TAG_LIMIT = 3
+
+# Each tag is embedded from its name and keywords alone; shared boilerplate
+# would pull every prototype towards every entry. Embedded once per process
+TAG_PROTOTYPES = {
+    tag: f"{tag}: {', '.join(words)}"
+    for tag, words in FALLBACK_TAG_KEYWORDS.items()
+}
+
+_tag_vectors = None
+_tag_vectors_lock = threading.Lock()
 
-        # Process tags: strip whitespace, remove # symbols, lowercase
-        tags = [tag.strip("#, ").lower() for tag in raw.split(",") if tag.strip()]
+def _unit(vector):
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+def _get_tag_vectors():
+    """Embed TAG_PROTOTYPES in one batched request on first use; returns [(tag, unit vector)]."""
+    global _tag_vectors
+    if _tag_vectors is None:
+        with _tag_vectors_lock:
+            if _tag_vectors is None:
+                response = client.embeddings.create(model=EMBEDDING_MODEL, input=list(TAG_PROTOTYPES.values()))
+                _tag_vectors = [
+                    (tag, _unit(item.embedding))
+                    for tag, item in zip(TAG_PROTOTYPES, response.data)
+                ]
+                logger.info(f"🧮 Embedded {len(_tag_vectors)} tag prototypes")
+    return _tag_vectors
+
+def get_embedding_tags(content):
+    """
+    Tag content by embedding it and picking the nearest tag prototypes.
+    
+    A single embeddings call replaces a chat completion; the tags are
+    limited to the FALLBACK_TAG_KEYWORDS vocabulary.
+    
+    Args:
+        content: The text content to generate tags for
+        
+    Returns:
+        List of up to EMBEDDING_TAG_LIMIT tags, best first, scoring within
+        EMBEDDING_TAG_MARGIN of the best tag and at least
+        EMBEDDING_TAG_MIN_SCORE, or empty list if none match or the call fails
+    """
+    try:
+        tag_vectors = _get_tag_vectors()
+        response = client.embeddings.create(model=EMBEDDING_MODEL, input=content)
+        vector = _unit(response.data[0].embedding)
         
-        # Limit to 5 tags maximum
-        tags = tags[:5]
+        scores = sorted(
+            ((sum(a * b for a, b in zip(proto, vector)), tag) for tag, proto in tag_vectors),
+            reverse=True
+        )
+        cutoff = max(scores[0][0] - EMBEDDING_TAG_MARGIN, EMBEDDING_TAG_MIN_SCORE)
+        tags = [tag for score, tag in scores[:EMBEDDING_TAG_LIMIT] if score >= cutoff]
         
-        logger.info(f"✅ Generated tags: {tags}")
+        logger.info(f"✅ Embedding tags: {tags}")
         return tags
         
     except Exception as e:
-        logger.error(f"❌ AI tag generation failed: {str(e)}")
-        # Return empty list rather than failing the request
+        logger.error(f"❌ Embedding tag generation failed: {str(e)}")
         return []
 
 
@@ -0,0 +1,154 @@
+import io
+import html
+import logging
+from datetime import datetime
+from functools import lru_cache
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from PIL import Image as PILImage
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# This module runs inside the PDF worker processes, so it only imports what
+# rendering needs (no Flask or Firebase)
+
+# PDF styles are immutable, so they are built once at import
+_PDF_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'TitleStyle',
+    parent=_PDF_STYLES['Heading1'],
+    fontSize=18,
+    textColor=colors.brown,
+    spaceAfter=12
+)
+
+_DATE_STYLE = ParagraphStyle(
+    'DateStyle',
+    parent=_PDF_STYLES['Normal'],
+    fontSize=10,
+    textColor=colors.gray,
+    spaceAfter=6
+)
+
+_CONTENT_STYLE = ParagraphStyle(
+    'ContentStyle',
+    parent=_PDF_STYLES['Normal'],
+    fontSize=12,
+    spaceAfter=12
+)
+
+_TAG_STYLE = ParagraphStyle(
+    'TagStyle',
+    parent=_PDF_STYLES['Normal'],
+    fontSize=9,
+    textColor=colors.darkgray,
+    spaceAfter=20
+)
+
+MAX_IMAGE_WIDTH = 5 * inch
+
+def format_tags(tags):
+    """Comma-separated tags for display; non-list values pass through"""
+    if type(tags) is list:
+        return ', '.join(tags)
+    return tags or ''
+
+@lru_cache(maxsize=512)
+def _format_memory_date(date_str):
+    """Format a YYYY-MM-DD memory date for display; other values are returned as-is"""
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').strftime('%B %d, %Y')
+    except (TypeError, ValueError):
+        return date_str
+
+def _flatten_to_jpeg(img):
+    """
+    JPEG-encode an image into a buffer; transparent pixels are composited
+    onto white, since dropping the alpha channel would render them black.
+    """
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        rgba = img.convert('RGBA')
+        img = PILImage.new('RGB', rgba.size, (255, 255, 255))
+        img.paste(rgba, mask=rgba.getchannel('A'))
+    image_buffer = io.BytesIO()
+    img.convert('RGB').save(image_buffer, 'JPEG', quality=82)
+    image_buffer.seek(0)
+    return image_buffer
+
+def _pdf_image(image_path):
+    """Image flowable for a downloaded image file, downscaled to MAX_IMAGE_WIDTH"""
+    with PILImage.open(image_path) as img:
+        width, height = img.size
+        if width <= MAX_IMAGE_WIDTH:
+            # Read from the file when the page is drawn
+            return Image(image_path, width=width, height=height)
+        ratio = MAX_IMAGE_WIDTH / width
+        # Let libjpeg decode large JPEGs at 1/2-1/8 scale
+        # so only the final trim needs a full resample
+        if img.format == 'JPEG' and width > 2 * MAX_IMAGE_WIDTH:
+            img.draft('RGB', (int(MAX_IMAGE_WIDTH), int(height * ratio)))
+        new_height = height * ratio
+        img = img.resize((int(MAX_IMAGE_WIDTH), int(new_height)), PILImage.LANCZOS)
+    image_buffer = _flatten_to_jpeg(img)
+    return Image(image_buffer, width=img.width, height=img.height)
+
+def render_entries_pdf(entries, images, failed_images, exported_on, pdf_path):
+    """
+    Lay out entries as a PDF and write it to pdf_path.
+
+    Args:
+        entries: Entry dicts (date_of_memory, content, media_url, tags)
+        images: Downloaded image file paths by media URL (None if unavailable)
+        failed_images: Media URLs whose download failed
+        exported_on: Export date shown under the title
+        pdf_path: File to write; the caller creates and removes it
+    """
+    elements = []
+
+    # Add title
+    elements.append(Paragraph("Hatchling Memories", _TITLE_STYLE))
+    elements.append(Paragraph(f"Exported on {exported_on}", _DATE_STYLE))
+    elements.append(Spacer(1, 0.25*inch))
+
+    # Add entries; Paragraph parses its text as markup, so entry
+    # values are escaped
+    for entry in entries:
+        # Add date
+        date_str = entry.get('date_of_memory') or 'Unknown date'
+        formatted_date = _format_memory_date(date_str)
+
+        elements.append(Paragraph(f"<b>{html.escape(str(formatted_date))}</b>", _DATE_STYLE))
+
+        # Add content
+        content = entry.get('content')
+        if content:
+            elements.append(Paragraph(html.escape(str(content)), _CONTENT_STYLE))
+
+        # Add media if available
+        media_url = entry.get('media_url')
+        if media_url:
+            try:
+                if media_url in failed_images:
+                    raise ValueError("download failed")
+                image_path = images.get(media_url)
+                if image_path:
+                    elements.append(_pdf_image(image_path))
+                    elements.append(Spacer(1, 0.1*inch))
+            except Exception as e:
+                logger.error(f"Error adding image to PDF: {str(e)}")
+                elements.append(Paragraph(f"[Image could not be displayed: {html.escape(media_url)}]", _CONTENT_STYLE))
+
+        # Add tags
+        tags_str = format_tags(entry.get('tags'))
+        if tags_str:
+            elements.append(Paragraph(f"Tags: {html.escape(str(tags_str))}", _TAG_STYLE))
+
+        elements.append(Spacer(1, 0.2*inch))
+
+    # Build the PDF
+    SimpleDocTemplate(pdf_path, pagesize=letter).build(elements)
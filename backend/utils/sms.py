@@ -1,6 +1,24 @@
 # utils/sms.py
 from twilio.rest import Client
 import os
+import threading
+
+_twilio = None
+_twilio_lock = threading.Lock()
+
+def get_twilio_client():
+    """
+    Return the process-wide Twilio client, creating it on first use.
+    
+    The client keeps a pooled HTTP session, so login and invite texts reuse
+    its open TLS connection instead of handshaking with Twilio each time.
+    """
+    global _twilio
+    if _twilio is None:
+        with _twilio_lock:
+            if _twilio is None:
+                _twilio = Client(os.getenv("TWILIO_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
+    return _twilio
 
 def send_login_link(phone, token):
     client = Client(os.getenv("TWILIO_SID"), os.getenv("TWILIO_AUTH"))
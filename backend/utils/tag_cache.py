@@ -0,0 +1,66 @@
+import os
+import json
+import hashlib
+import logging
+import redis
+from utils.openai_client import get_embedding_tags, generate_fallback_tags, should_ai_tag
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Cached tags expire after a day
+TAG_CACHE_TTL_SECONDS = 86400
+
+_redis_client = None
+
+def _get_redis():
+    """Lazily connect to Redis; returns None when REDIS_URL is not configured."""
+    global _redis_client
+    if _redis_client is None and os.getenv("REDIS_URL"):
+        _redis_client = redis.Redis.from_url(os.getenv("REDIS_URL"), socket_timeout=1)
+    return _redis_client
+
+def _cache_key(content):
+    normalized = content.strip().lower()
+    return "embtags:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def get_or_compute_tags(content):
+    """
+    Get embedding-based tags for content, memoized in Redis by a hash of the normalized text.
+    
+    Args:
+        content: The text content to generate tags for
+        
+    Returns:
+        List of tags; keyword fallback tags if the content is too short to
+        be worth an OpenAI request, or if OpenAI or the cache fails
+    """
+    if not should_ai_tag(content):
+        return generate_fallback_tags(content)
+
+    cache = None
+    key = _cache_key(content)
+    try:
+        cache = _get_redis()
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info("🗃️ AI tag cache hit")
+                return json.loads(cached)
+    except Exception as e:
+        # Treat cache errors as a miss
+        logger.error(f"❌ AI tag cache lookup failed: {str(e)}")
+        cache = None
+
+    tags = get_embedding_tags(content)
+    if not tags:
+        # get_embedding_tags returns [] on failure or no match; don't cache the fallback
+        return generate_fallback_tags(content)
+
+    if cache is not None:
+        try:
+            cache.setex(key, TAG_CACHE_TTL_SECONDS, json.dumps(tags))
+        except Exception as e:
+            logger.error(f"❌ AI tag cache write failed: {str(e)}")
+
+    return tags
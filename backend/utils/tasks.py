@@ -0,0 +1,200 @@
+import os
+import re
+import logging
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, wait
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition
+from utils.db import get_db
+from utils.media import upload_media_file_to_firebase, copy_remote_media_to_firebase
+from utils.openai_client import transcribe_audio
+from utils.tag_cache import get_or_compute_tags
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "4"))
+
+# Jobs live only in this process's memory (and uploads in its temp dir), so
+# a restart, timeout or deploy drops any that have not finished; their
+# entries stay "pending" until fail_stale_pending_entries picks them up
+STALE_PENDING_MINUTES = int(os.getenv("STALE_PENDING_MINUTES", "30"))
+
+# Shared pool for work that runs after the HTTP response has been sent
+_executor = ThreadPoolExecutor(
+    max_workers=BACKGROUND_WORKERS,
+    thread_name_prefix="entry-task"
+)
+
+# The blocking calls of each job (up to three) run here, so a job waits on
+# its own calls without taking workers from _executor
+_call_pool = ThreadPoolExecutor(
+    max_workers=3 * BACKGROUND_WORKERS,
+    thread_name_prefix="entry-call"
+)
+
+_AUDIO_RE = re.compile(r"\.(?:m4a|mp3|ogg|wav)$", re.IGNORECASE)
+
+def _upload_media(tmp_path, filename, content_type, author_id):
+    folder_path = f"users/{author_id}/entries"
+    return upload_media_file_to_firebase(tmp_path, filename, content_type, folder_path)
+
+def _transcribe_media(tmp_path):
+    with open(tmp_path, "rb") as media_file:
+        return transcribe_audio(media_file)
+
+def _submit_entry_calls(tmp_path, filename, content_type, author_id, content, generate_tags):
+    """Start upload, transcription and tagging concurrently; returns {field: Future}."""
+    futures = {}
+    if tmp_path:
+        futures["media_url"] = _call_pool.submit(_upload_media, tmp_path, filename, content_type, author_id)
+        if _AUDIO_RE.search(filename):
+            futures["transcription"] = _call_pool.submit(_transcribe_media, tmp_path)
+    if generate_tags:
+        futures["tags"] = _call_pool.submit(get_or_compute_tags, content)
+    return futures
+
+def process_entry_media(entry_id, tmp_path, filename, content_type, author_id, content, generate_tags=False):
+    """
+    Upload media, transcribe audio and generate AI tags for an entry,
+    then patch the stored entry with the results.
+
+    The three calls are independent, so they run concurrently and the job
+    takes as long as the slowest one rather than their sum.
+
+    Args:
+        entry_id: ID of the entry to update
+        tmp_path: Path of the spooled media file, or None if there is no media
+        filename: Original media filename
+        content_type: Media MIME type
+        author_id: Author of the entry (used for the storage folder)
+        content: Text content of the entry
+        generate_tags: Whether AI tags should be generated from content
+    """
+    update_data = {"processing_status": "done", "updated_at": firestore.SERVER_TIMESTAMP}
+
+    try:
+        futures = _submit_entry_calls(tmp_path, filename, content_type, author_id, content, generate_tags)
+        wait(futures.values())
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    for field, future in futures.items():
+        error = future.exception()
+        if error is not None:
+            logger.error(f"❌ Background {field} failed for entry {entry_id}: {str(error)}")
+            if field != "tags":
+                update_data["processing_status"] = "failed"
+            continue
+        result = future.result()
+        logger.info(f"✅ Background {field} for entry {entry_id}: {result}")
+        if field != "tags" or result:
+            update_data[field] = result
+
+    try:
+        get_db().collection("entries").document(entry_id).update(update_data)
+        logger.info(f"✅ Background processing finished for entry {entry_id}")
+    except Exception as e:
+        logger.error(f"❌ Failed to save background results for entry {entry_id}: {str(e)}")
+
+def _copy_sms_media(media_url, author_id):
+    auth = (os.environ.get("TWILIO_SID"), os.environ.get("TWILIO_AUTH_TOKEN"))
+    return copy_remote_media_to_firebase(media_url, f"users/{author_id}/entries", auth=auth)
+
+def process_sms_media(entry_id, media_urls, author_id):
+    """
+    Copy an SMS entry's MMS attachments into storage in parallel, then
+    point the entry at the copies.
+
+    An attachment that cannot be copied keeps its Twilio URL, so it is
+    never dropped from the entry.
+
+    Args:
+        entry_id: ID of the entry to update
+        media_urls: Twilio MediaUrlN values, in order
+        author_id: Author of the entry (used for the storage folder)
+    """
+    futures = [_call_pool.submit(_copy_sms_media, url, author_id) for url in media_urls]
+
+    stored_media = []
+    for url, future in zip(media_urls, futures):
+        try:
+            stored_media.append(future.result())
+        except Exception as e:
+            logger.error(f"❌ Failed to store SMS media {url} for entry {entry_id}: {str(e)}")
+            stored_media.append(url)
+
+    try:
+        get_db().collection("entries").document(entry_id).update({
+            "media_url": stored_media[0] if stored_media else None,
+            "media_urls": stored_media,
+            "processing_status": "done",
+            "updated_at": firestore.SERVER_TIMESTAMP
+        })
+        logger.info(f"✅ Stored {len(stored_media)} SMS attachments for entry {entry_id}")
+    except Exception as e:
+        logger.error(f"❌ Failed to save SMS media for entry {entry_id}: {str(e)}")
+
+def enqueue_sms_media(entry_id, media_urls, author_id):
+    """
+    Queue process_sms_media to run in the background.
+
+    Returns:
+        Future for the queued job
+    """
+    logger.info(f"📬 Queued MMS copy for entry {entry_id}")
+    return _executor.submit(process_sms_media, entry_id, media_urls, author_id)
+
+def enqueue_media_processing(entry_id, tmp_path, filename, content_type, author_id, content, generate_tags=False):
+    """
+    Queue process_entry_media to run in the background.
+
+    Returns:
+        Future for the queued job
+    """
+    logger.info(f"📬 Queued background processing for entry {entry_id}")
+    return _executor.submit(
+        process_entry_media,
+        entry_id, tmp_path, filename, content_type, author_id, content, generate_tags
+    )
+
+def fail_stale_pending_entries(max_age=None):
+    """
+    Mark entries whose background job was lost as failed.
+
+    An entry still "pending" well after its last write had its job dropped
+    with the process that queued it. Each write is conditional on the
+    snapshot read here, so a job finishing meanwhile is left alone.
+
+    Args:
+        max_age: timedelta after which a pending entry is stale
+            (default STALE_PENDING_MINUTES)
+
+    Returns:
+        Number of entries marked failed
+    """
+    max_age = max_age or timedelta(minutes=STALE_PENDING_MINUTES)
+    cutoff = datetime.now(timezone.utc) - max_age
+    db = get_db()
+
+    # Few entries are pending at once, so the age check happens here
+    # rather than needing a (processing_status, updated_at) index
+    pending = db.collection("entries").where("processing_status", "==", "pending").select(["updated_at"]).stream()
+
+    failed = 0
+    for entry in pending:
+        updated_at = entry.to_dict().get("updated_at")
+        if updated_at is not None and updated_at > cutoff:
+            continue
+        try:
+            entry.reference.update({
+                "processing_status": "failed",
+                "updated_at": firestore.SERVER_TIMESTAMP
+            }, option=db.write_option(last_update_time=entry.update_time))
+            failed += 1
+            logger.warning(f"⚠️ Marked stale pending entry {entry.id} as failed")
+        except FailedPrecondition:
+            logger.info(f"Entry {entry.id} changed during the stale sweep; skipped")
+
+    return failed
@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    Thread-safe in-process cache whose entries expire ttl seconds after
+    they are set.
+
+    Every entry lives for the same ttl, so insertion order is also expiry
+    order: expired entries are trimmed from the front, and when the cache
+    is full the oldest entry is evicted.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._data:
+            key, (expires_at, _) = next(iter(self._data.items()))
+            if expires_at > now:
+                return
+            del self._data[key]
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                return default
+            return item[1]
+
+    def set(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._data.pop(key, None)
+            if len(self._data) >= self._maxsize:
+                self._data.popitem(last=False)
+            self._data[key] = (now + self._ttl, value)
+
+    def pop(self, key, default=None):
+        """Remove key, returning its value (expired or not) or default"""
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
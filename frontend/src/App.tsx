@@ -7,7 +7,6 @@ import Login from './components/Login';
 import AdminPanel from './components/AdminPanel';
 import { useState, useEffect } from 'react';
 import { JournalEntry } from './types';
-import { fetchEntries } from './api/entries';
 
 // Admin route wrapper component
 const AdminRoute = ({ children }: { children: React.ReactNode }) => {
@@ -24,7 +23,6 @@ function App() {
   const [selectedEntry, setSelectedEntry] = useState<JournalEntry | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [showSettings, setShowSettings] = useState(false);
-  const [entries, setEntries] = useState<JournalEntry[]>([]);
   const [refreshTrigger, setRefreshTrigger] = useState(0);
   const [isAdmin, setIsAdmin] = useState(false);
 
@@ -34,20 +32,6 @@ function App() {
     setIsAdmin(adminStatus);
   }, []);
 
-  // Fetch entries when the app loads or when refreshTrigger changes
-  useEffect(() => {
-    const loadEntries = async () => {
-      try {
-        const entriesData = await fetchEntries();
-        setEntries(entriesData);
-      } catch (error) {
-        console.error('Error fetching entries:', error);
-      }
-    };
-
-    loadEntries();
-  }, [refreshTrigger]);
-
   const openModal = (entry: JournalEntry | null = null) => {
     setSelectedEntry(entry);
     setIsModalOpen(true);
@@ -107,7 +91,6 @@ function App() {
         <Routes>
           <Route path="/" element={
             <JournalView 
-              entries={entries}
               onSelectEntry={openModal} 
               onOpenSettings={openSettings}
               onRefresh={() => setRefreshTrigger(prev => prev + 1)}
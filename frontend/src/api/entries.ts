@@ -1,11 +1,13 @@
 import axiosInstance from './axios/axiosInstance';
 import { JournalEntry } from '../types';
+import { EntriesPage } from '../types/entry';
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL
   ? `${import.meta.env.VITE_API_BASE_URL}/entry`
   : '/api/entry';
 
-export async function fetchEntries(filters = {}): Promise<JournalEntry[]> {
+// Fetch one page of entries; pass the returned next_cursor to get the next page
+export async function fetchEntries(filters = {}, cursor: string | null = null): Promise<EntriesPage> {
   try {
     // Build query params from filters
     const params = {};
@@ -16,9 +18,16 @@ export async function fetchEntries(filters = {}): Promise<JournalEntry[]> {
       }
     });
     
+    if (cursor) {
+      params['cursor'] = cursor;
+    }
+    
     const response = await axiosInstance.get(API_BASE, { params });
     
-    return response.data.entries || [];
+    return {
+      entries: response.data.entries || [],
+      next_cursor: response.data.next_cursor || null
+    };
   } catch (error) {
     console.error('❌ Fetch entries error:', error);
     throw error;
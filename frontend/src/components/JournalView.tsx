@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useToast } from '@chakra-ui/react';
 import { Search, Filter, FileText, User, Eye, Plus, X } from 'lucide-react';
 import EntryCard from './EntryCard';
@@ -23,7 +23,8 @@ const EmptyState = () => (
   </div>
 );
 
-// Filter interface
+// Filter interface; tag, privacy and author_id are applied by the API,
+// the date range client-side over the pages loaded so far
 interface Filters {
   tag?: string;
   privacy?: string;
@@ -37,6 +38,8 @@ const JournalView: React.FC = () => {
   const [entries, setEntries] = useState<Entry[]>([]);
   const [filteredEntries, setFilteredEntries] = useState<Entry[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [search, setSearch] = useState('');
   const [showFilters, setShowFilters] = useState(false);
@@ -51,14 +54,28 @@ const JournalView: React.FC = () => {
   // Toast for notifications
   const toast = useToast();
 
-  // Fetch entries on component mount
+  // Guards against an older request overwriting the results of a newer one
+  const latestRequest = useRef(0);
+
+  const serverFilters = {
+    tag: filters.tag,
+    privacy: filters.privacy,
+    author_id: filters.author_id
+  };
+
+  // Search and the date range have no server equivalent, so while more pages
+  // remain they only cover the entries loaded so far
+  const isClientFiltered = Boolean(search || filters.start_date || filters.end_date);
+  const isPartial = isClientFiltered && nextCursor !== null;
+
+  // Fetch from the first page on mount and whenever a server filter changes
   useEffect(() => {
     fetchEntriesData();
-  }, []);
+  }, [filters.tag, filters.privacy, filters.author_id]);
 
-  // Filter entries when search or filters change
+  // Apply search and date range to the loaded entries
   useEffect(() => {
-    if (!search && Object.keys(filters).length === 0) {
+    if (!isClientFiltered) {
       setFilteredEntries(entries);
       return;
     }
@@ -74,19 +91,6 @@ const JournalView: React.FC = () => {
       );
     }
     
-    // Apply other filters
-    if (filters.tag) {
-      filtered = filtered.filter(entry => entry.tags?.includes(filters.tag!));
-    }
-    
-    if (filters.privacy) {
-      filtered = filtered.filter(entry => entry.privacy === filters.privacy);
-    }
-    
-    if (filters.author_id) {
-      filtered = filtered.filter(entry => entry.author_id === filters.author_id);
-    }
-    
     if (filters.start_date) {
       filtered = filtered.filter(entry => entry.date_of_memory >= filters.start_date!);
     }
@@ -96,29 +100,55 @@ const JournalView: React.FC = () => {
     }
     
     setFilteredEntries(filtered);
-  }, [search, filters, entries]);
+  }, [search, filters.start_date, filters.end_date, entries]);
 
-  // Fetch entries data
+  // Fetch the first page of entries for the current filters
   const fetchEntriesData = async () => {
+    const requestId = ++latestRequest.current;
     setLoading(true);
     setError('');
     
     try {
-      const data = await fetchEntries();
+      const { entries: data, next_cursor } = await fetchEntries(serverFilters);
+      if (requestId !== latestRequest.current) return;
       setEntries(data);
-      setFilteredEntries(data);
+      setNextCursor(next_cursor);
     } catch (err) {
+      if (requestId !== latestRequest.current) return;
       console.error('Error fetching entries:', err);
       setError('Failed to load entries');
     } finally {
-      setLoading(false);
+      if (requestId === latestRequest.current) {
+        setLoading(false);
+      }
+    }
+  };
+
+  // Fetch the next page of entries and append it
+  const loadMoreEntries = async () => {
+    if (!nextCursor || loadingMore) return;
+    
+    const requestId = latestRequest.current;
+    setLoadingMore(true);
+    setError('');
+    
+    try {
+      const { entries: data, next_cursor } = await fetchEntries(serverFilters, nextCursor);
+      if (requestId !== latestRequest.current) return;
+      setEntries(prev => [...prev, ...data]);
+      setNextCursor(next_cursor);
+    } catch (err) {
+      console.error('Error fetching more entries:', err);
+      setError('Failed to load entries');
+    } finally {
+      setLoadingMore(false);
     }
   };
 
   // Refresh entries
   const onRefresh = useCallback(() => {
     fetchEntriesData();
-  }, []);
+  }, [filters.tag, filters.privacy, filters.author_id]);
 
   // Handle entry click
   const handleEntryClick = (entry: Entry) => {
@@ -130,27 +160,12 @@ const JournalView: React.FC = () => {
     }
   };
 
-  // Update filter
+  // Update filter; a server filter change refetches from the first page
   const updateFilter = (key: keyof Filters, value: string | undefined) => {
     setFilters(prev => ({
       ...prev,
       [key]: value
     }));
-    
-    // Apply filters client-side for now
-    let filtered = [...entries];
-    
-    if (value) {
-      if (key === 'tag') {
-        filtered = filtered.filter(entry => entry.tags?.includes(value));
-      } else if (key === 'privacy') {
-        filtered = filtered.filter(entry => entry.privacy === value);
-      } else if (key === 'author_id') {
-        filtered = filtered.filter(entry => entry.author_id === value);
-      }
-    }
-    
-    setFilteredEntries(filtered);
   };
 
   // Clear all filters
@@ -158,7 +173,6 @@ const JournalView: React.FC = () => {
     setFilters({});
     setSearch('');
     setShowFilters(false);
-    setFilteredEntries(entries);
   };
 
   // Retry loading entries
@@ -448,13 +462,20 @@ const JournalView: React.FC = () => {
         </div>
       )}
 
+      {/* Search and date range only cover the pages loaded so far */}
+      {!loading && isPartial && (
+        <div className="mb-4 p-3 bg-warm-sand bg-opacity-40 text-clay-brown text-sm rounded-xl">
+          Showing matches from the memories loaded so far. Load more to search older memories.
+        </div>
+      )}
+
       {/* Loading state */}
       {loading ? (
         <div className="flex justify-center items-center h-40">
           <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-clay-brown"></div>
         </div>
       ) : filteredEntries.length === 0 ? (
-        <EmptyState />
+        isPartial ? null : <EmptyState />
       ) : (
         <div className="space-y-4">
           {filteredEntries.map((entry) => (
@@ -488,6 +509,19 @@ const JournalView: React.FC = () => {
         </div>
       )}
       
+      {/* Load the next page of entries */}
+      {!loading && nextCursor && (
+        <div className="flex justify-center mt-6">
+          <button
+            onClick={loadMoreEntries}
+            disabled={loadingMore}
+            className="px-4 py-2 text-sm bg-white border border-warm-sand text-clay-brown rounded-xl hover:bg-blush-pink hover:text-white transition-colors disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more memories'}
+          </button>
+        </div>
+      )}
+      
       {/* Add new entry button */}
       <div className="fixed bottom-6 right-6">
         <button
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { JournalEntry } from '../types';
 import { EntryFilters } from '../types/entry';
 import { fetchEntries } from '../api/entries';
@@ -15,6 +15,8 @@ const JournalView: React.FC<Props> = ({ onSelectEntry }) => {
   const [entries, setEntries] = useState<JournalEntry[]>([]);
   const [filteredEntries, setFilteredEntries] = useState<JournalEntry[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [search, setSearch] = useState('');
   const [showModal, setShowModal] = useState(false);
   const [selectedEntry, setSelectedEntry] = useState<JournalEntry | null>(null);
@@ -23,40 +25,74 @@ const JournalView: React.FC<Props> = ({ onSelectEntry }) => {
   const [error, setError] = useState('');
   const [refreshTrigger, setRefreshTrigger] = useState(0);
 
+  // Guards against an older request overwriting the results of a newer one
+  const latestRequest = useRef(0);
+
+  // tag, privacy and author_id are applied by the API; the date range and
+  // search run client-side over the pages loaded so far
+  const serverFilters = {
+    tag: filters.tag,
+    privacy: filters.privacy,
+    author_id: filters.author_id
+  };
+  const isPartial = Boolean(search.trim() || filters.start_date || filters.end_date) && nextCursor !== null;
+
   const loadEntries = async () => {
+    const requestId = ++latestRequest.current;
     setLoading(true);
     setError('');
     try {
-      const data = await fetchEntries(filters);
+      const { entries: data, next_cursor } = await fetchEntries(serverFilters);
+      if (requestId !== latestRequest.current) return;
       setEntries(data);
-      setFilteredEntries(data);
+      setNextCursor(next_cursor);
     } catch (error: any) {
+      if (requestId !== latestRequest.current) return;
       console.error('Failed to fetch entries:', error);
       setError('Failed to load memories. Please try again.');
     } finally {
-      setLoading(false);
+      if (requestId === latestRequest.current) {
+        setLoading(false);
+      }
+    }
+  };
+
+  // Fetch the next page of entries and append it
+  const loadMoreEntries = async () => {
+    if (!nextCursor || loadingMore) return;
+    const requestId = latestRequest.current;
+    setLoadingMore(true);
+    try {
+      const { entries: data, next_cursor } = await fetchEntries(serverFilters, nextCursor);
+      if (requestId !== latestRequest.current) return;
+      setEntries(prev => [...prev, ...data]);
+      setNextCursor(next_cursor);
+    } catch (error: any) {
+      console.error('Failed to fetch more entries:', error);
+      setError('Failed to load memories. Please try again.');
+    } finally {
+      setLoadingMore(false);
     }
   };
 
-  // Load entries on initial render and when filters change
+  // Load entries from the first page on initial render and when a server filter changes
   useEffect(() => {
     loadEntries();
-  }, [refreshTrigger, JSON.stringify(filters)]);
+  }, [refreshTrigger, filters.tag, filters.privacy, filters.author_id]);
 
-  // Apply search filter separately (client-side filtering)
+  // Apply search and date range separately (client-side filtering)
   useEffect(() => {
-    if (search.trim() === '') {
-      setFilteredEntries(entries);
-    } else {
-      const lowerSearch = search.toLowerCase();
-      setFilteredEntries(
-        entries.filter((entry) =>
+    const lowerSearch = search.trim().toLowerCase();
+    setFilteredEntries(
+      entries.filter((entry) =>
+        (!lowerSearch ||
           entry.content?.toLowerCase().includes(lowerSearch) ||
-          entry.tags?.some(tag => tag.toLowerCase().includes(lowerSearch))
-        )
-      );
-    }
-  }, [search, entries]);
+          entry.tags?.some(tag => tag.toLowerCase().includes(lowerSearch))) &&
+        (!filters.start_date || entry.date_of_memory >= filters.start_date) &&
+        (!filters.end_date || entry.date_of_memory <= filters.end_date)
+      )
+    );
+  }, [search, filters.start_date, filters.end_date, entries]);
 
   const handleDelete = async (id: string) => {
     const confirmed = window.confirm("Delete this memory?");
@@ -278,13 +314,20 @@ const JournalView: React.FC<Props> = ({ onSelectEntry }) => {
         </div>
       )}
 
+      {/* Search and date range only cover the pages loaded so far */}
+      {!loading && isPartial && (
+        <div className="mb-4 p-3 bg-warm-sand bg-opacity-40 text-clay-brown text-sm rounded-xl">
+          Showing matches from the memories loaded so far. Load more to search older memories.
+        </div>
+      )}
+
       {/* Loading state */}
       {loading ? (
         <div className="flex justify-center items-center h-40">
           <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-clay-brown"></div>
         </div>
       ) : filteredEntries.length === 0 ? (
-        <EmptyState />
+        isPartial ? null : <EmptyState />
       ) : (
         <div className="space-y-4">
           {filteredEntries.map((entry) => (
@@ -307,6 +350,19 @@ const JournalView: React.FC<Props> = ({ onSelectEntry }) => {
         </div>
       )}
 
+      {/* Load the next page of entries */}
+      {!loading && nextCursor && (
+        <div className="flex justify-center mt-6">
+          <button
+            onClick={loadMoreEntries}
+            disabled={loadingMore}
+            className="px-4 py-2 text-sm bg-white border border-warm-sand text-clay-brown rounded-xl hover:bg-blush-pink hover:text-white transition-colors disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more memories'}
+          </button>
+        </div>
+      )}
+
       {/* New memory button */}
       <button
         onClick={() => {
@@ -31,6 +31,11 @@ export interface EntryResponse {
   message?: string;
 }
 
+export interface EntriesPage {
+  entries: JournalEntry[];
+  next_cursor: string | null;
+}
+
 export interface EntriesResponse {
   entries: JournalEntry[];
   success: boolean;